@@ -0,0 +1,85 @@
+"""Bounded activity log model.
+
+The UI only ever holds the most recent `capacity` lines (a ring buffer that
+the log widget mirrors as a window), so memory and insert cost stay flat over
+a 40k-file session. The full history is streamed to a size-rotated text file
+(archivium.log, archivium.log.1, ...) in the app data folder.
+"""
+import datetime, os, threading
+from collections import deque
+
+DEFAULT_CAPACITY = 2000
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+
+class RotatingLogFile:
+    """Append-only text log that rotates to .1 ... .N once it exceeds max_bytes."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        self.path = path; self.max_bytes = max_bytes; self.backups = backups
+        self._lock = threading.Lock()
+        self._f = None
+
+    def _open(self):
+        if self._f is None:
+            self._f = open(self.path, "a", encoding="utf-8")
+        return self._f
+
+    def _rotate(self):
+        self._f.close(); self._f = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src): os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0: os.replace(self.path, f"{self.path}.1")
+        else: os.remove(self.path)
+
+    def write_lines(self, lines):
+        stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        text = "".join(f"{stamp} {line}\n" for line in lines)
+        with self._lock:
+            f = self._open()
+            f.write(text); f.flush()
+            if f.tell() >= self.max_bytes: self._rotate()
+
+    def close(self):
+        with self._lock:
+            if self._f: self._f.close(); self._f = None
+
+
+class ActivityLog:
+    """Ring buffer of recent lines plus an optional on-disk history."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, log_file=None):
+        self.capacity = max(1, int(capacity))
+        self.lines = deque(maxlen=self.capacity)
+        self.log_file = log_file
+
+    def extend(self, lines):
+        """Records lines; returns the ones that can still be visible (at most capacity)."""
+        if self.log_file:
+            try: self.log_file.write_lines(lines)
+            except OSError: pass
+        self.lines.extend(lines)
+        return lines[-self.capacity:]
+
+
+class TextWindow:
+    """Keeps a Tk Text widget in sync with an ActivityLog, never above capacity lines."""
+
+    def __init__(self, widget, model):
+        self.widget = widget; self.model = model
+        self.shown = 0
+
+    def append(self, lines):
+        visible = self.model.extend(lines)
+        w = self.widget
+        w.configure(state="normal")
+        w.insert("end", "\n".join(visible) + "\n")
+        self.shown += len(visible)
+        excess = self.shown - self.model.capacity
+        if excess > 0:
+            w.delete("1.0", f"{excess + 1}.0")
+            self.shown -= excess
+        w.see("end")
+        w.configure(state="disabled")
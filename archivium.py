@@ -0,0 +1,117 @@
+"""Headless command line for Archivium.
+
+    python -m archivium ingest SRC DEST [--mode current|date_then_type|type_then_date] [--move] [--resume] [--all] [--dedup MODE] [--count-first] [--verify [ALGO]]
+
+Runs the same engine as the GUI without importing tkinter, customtkinter or
+PIL, and prints one JSON object per line on stdout:
+
+    {"event": "start", "src": ..., "dest": ..., "mode": ..., "move": ...}
+    {"event": "log", "message": ...}
+    {"event": "progress", "files_done": ..., "files_total": ..., "bytes_done": ..., ...}
+    {"event": "done", "success": ..., "cancelled": ..., "files": ..., "bytes": ..., ...}
+
+Exit status: 0 on success, 1 if the transfer failed or had errors, 130 when
+interrupted (Ctrl+C / SIGINT, SIGTERM).
+"""
+import argparse, json, os, signal, sys, threading, time
+
+from ingest import MODES, Ingest, load_config, prepare_destination
+from journal import find_resumable
+
+
+class JsonLines:
+    """Thread-safe JSON-lines writer with throttled progress events."""
+
+    def __init__(self, stream=sys.stdout, progress_interval=0.5):
+        self.stream = stream; self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+
+    def emit(self, event, **fields):
+        line = json.dumps({"event": event, **fields}, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n"); self.stream.flush()
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    def progress(self, p):
+        now = time.monotonic()
+        final = not p.scanning and p.files_done == p.files_total
+        if not final and now - self._last_progress < self.progress_interval: return
+        self._last_progress = now
+        self.emit("progress", kind=p.kind, files_done=p.files_done, files_total=p.files_total,
+                  bytes_done=p.bytes_done, bytes_total=p.bytes_total, fraction=round(p.fraction, 4),
+                  rate=round(p.rate, 1), eta=None if p.eta is None else round(p.eta, 1), scanning=p.scanning)
+
+
+def cmd_ingest(args):
+    out = JsonLines(progress_interval=args.progress_interval)
+    cfg = load_config()
+    mode = args.mode or cfg.get("organize_mode", "current")
+    if args.workers: cfg["transfer_workers"] = args.workers
+    if args.backend: cfg["copy_backend"] = args.backend
+    if args.all: cfg["skip_imported"] = False
+    if args.dedup: cfg["dedup"] = args.dedup
+    if args.count_first: cfg["scan_count_first"] = True
+    if args.verify: cfg["verify_copies"] = True; cfg["verify_algorithm"] = args.verify
+    for path, what in ((args.src, "Source"), (args.dest, "Destination")):
+        if not os.path.isdir(path):
+            out.emit("error", message=f"{what} folder does not exist: {path}"); return 1
+    cancel_event = threading.Event()
+    def on_signal(signum, frame): cancel_event.set()
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"): signal.signal(signal.SIGTERM, on_signal)
+
+    resume = args.resume and find_resumable(args.dest, mode, args.src) is not None
+    if args.resume and not resume: out.log("Nothing to resume; starting a new transfer")
+    try:
+        out_base = prepare_destination(args.dest, mode, resume, args.src)
+    except OSError as e:
+        out.emit("error", message=f"Cannot prepare destination: {e}"); return 1
+    out.emit("start", src=args.src, dest=out_base, mode=mode, move=args.move, resume=resume)
+    run = Ingest(cfg, cancel_event, log_cb=out.log, progress_cb=out.progress)
+    try:
+        success = run.run(args.src, out_base, mode, args.move, resume)
+    except Exception as e:
+        out.emit("error", message=str(e)); success = False
+    stats = run.stats
+    out.emit("done", success=success, cancelled=cancel_event.is_set(), dest=out_base,
+             files=stats.files if stats else 0, failed=stats.failed if stats else 0,
+             duplicates=stats.duplicates if stats else 0,
+             bytes=stats.bytes if stats else 0, seconds=round(stats.elapsed, 3) if stats else 0.0,
+             files_per_s=round(stats.files_per_s, 1) if stats else 0.0,
+             mb_per_s=round(stats.mb_per_s, 1) if stats else 0.0, report=run.report_path)
+    if cancel_event.is_set(): return 130
+    return 0 if success and not (stats and stats.failed) else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="archivium", description="Archivium headless ingest")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="copy or move media from SRC into DEST")
+    p.add_argument("src")
+    p.add_argument("dest")
+    p.add_argument("--mode", choices=MODES, help="organize mode (default: organize_mode from config.json)")
+    p.add_argument("--move", action="store_true", help="move instead of copy")
+    p.add_argument("--workers", type=int, help="copy workers (overrides transfer_workers)")
+    p.add_argument("--backend", choices=("auto", "kernel", "shutil"), help="copy backend (overrides copy_backend)")
+    p.add_argument("--resume", action="store_true", help="continue the latest interrupted transfer into DEST")
+    p.add_argument("--all", action="store_true", help="also copy files already imported from this card before")
+    p.add_argument("--dedup", choices=("off", "skip", "hardlink"), help="handling of identical files (overrides dedup)")
+    p.add_argument("--count-first", action="store_true",
+                   help="count the media on SRC before copying so progress has real totals from the start")
+    p.add_argument("--verify", nargs="?", const="xxhash", choices=("xxhash", "blake2b"),
+                   help="hash every file while copying and check the destination (default algorithm: xxhash)")
+    p.add_argument("--progress-interval", type=float, default=0.5, help="seconds between progress lines")
+    p.set_defaults(func=cmd_ingest)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
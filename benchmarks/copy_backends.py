@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shutil.copy2 vs the kernel copy backend
+
+Usage:
+    python benchmarks/copy_backends.py [--workdir DIR] [--dest DIR] [--burst 20] [--burst-mb 50]
+                                       [--video-gb 4] [--videos 1] [--chunk-mb 64] [--json OUT]
+
+Two workloads are generated once in --workdir and copied with every backend:
+a burst of --burst files of --burst-mb MB (camera JPEG/RAW bursts) and
+--videos clips of --video-gb GB. MB/s is wall-clock throughput; CPU% is
+(user + system) CPU time of this process divided by wall time, so kernel-side
+copy work is included. Sources are read once before timing so every backend
+sees the same (warm) page cache; point --dest at another device to include
+cross-device effects.
+"""
+import argparse, json, os, resource, shutil, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from copy_backends import BACKENDS, KERNEL_AVAILABLE, get_copy_backend
+
+MB = 1024 * 1024
+
+
+def make_file(path, size):
+    if os.path.exists(path) and os.path.getsize(path) == size: return
+    block = os.urandom(4 * MB)
+    with open(path, "wb") as f:
+        left = size
+        while left > 0:
+            n = min(left, len(block)); f.write(block[:n]); left -= n
+
+
+def warm(paths):
+    for p in paths:
+        with open(p, "rb") as f:
+            while f.read(16 * MB): pass
+
+
+def cpu_seconds():
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    return ru.ru_utime + ru.ru_stime
+
+
+def run_backend(name, copy, files, dest):
+    out_dir = os.path.join(dest, name)
+    shutil.rmtree(out_dir, ignore_errors=True); os.makedirs(out_dir)
+    total = sum(os.path.getsize(f) for f in files)
+    cpu0, t0 = cpu_seconds(), time.perf_counter()
+    for f in files: copy(f, os.path.join(out_dir, os.path.basename(f)))
+    wall, cpu = time.perf_counter() - t0, cpu_seconds() - cpu0
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return {"backend": name, "files": len(files), "mb": round(total / MB, 1), "seconds": round(wall, 3),
+            "mb_per_s": round(total / MB / wall, 1) if wall else 0.0,
+            "cpu_percent": round(100 * cpu / wall, 1) if wall else 0.0}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "archivium-bench"))
+    ap.add_argument("--dest", default=None, help="destination root (default: <workdir>/out)")
+    ap.add_argument("--burst", type=int, default=20)
+    ap.add_argument("--burst-mb", type=float, default=50)
+    ap.add_argument("--videos", type=int, default=1)
+    ap.add_argument("--video-gb", type=float, default=4)
+    ap.add_argument("--chunk-mb", type=int, default=64)
+    ap.add_argument("--json", default=None, help="also write results to this file")
+    args = ap.parse_args()
+
+    src = os.path.join(args.workdir, "src"); dest = args.dest or os.path.join(args.workdir, "out")
+    os.makedirs(src, exist_ok=True); os.makedirs(dest, exist_ok=True)
+    workloads = {
+        "jpeg_burst": [os.path.join(src, f"IMG_{i:04d}.JPG") for i in range(args.burst)],
+        "video": [os.path.join(src, f"CLIP_{i:04d}.MOV") for i in range(args.videos)],
+    }
+    print("Generating sources...")
+    for p in workloads["jpeg_burst"]: make_file(p, int(args.burst_mb * MB))
+    for p in workloads["video"]: make_file(p, int(args.video_gb * 1024 * MB))
+
+    backends = [b for b in BACKENDS if b != "auto" and (b != "kernel" or KERNEL_AVAILABLE)]
+    results = []
+    for workload, files in workloads.items():
+        if not files: continue
+        warm(files)
+        for name in backends:
+            r = run_backend(name, get_copy_backend(name, args.chunk_mb * MB), files, dest)
+            r["workload"] = workload; results.append(r)
+            print(f"{workload:<11} {name:<7} {r['mb']:>9.1f} MB  {r['seconds']:>8.2f}s  "
+                  f"{r['mb_per_s']:>8.1f} MB/s  CPU {r['cpu_percent']:>5.1f}%")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
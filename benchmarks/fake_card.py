@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Reproducible synthetic camera cards for ingest benchmarks
+
+Usage:
+    python benchmarks/fake_card.py OUT [--seed 1] [--folders 2] [--shots 400] [--raw-pairs 0.5]
+                                       [--jpeg-kb 6000] [--raw-mb 25] [--videos 2] [--video-gb 4]
+                                       [--days 3]
+
+Lays out OUT/DCIM/100CANON, 101CANON, ... with IMG_0001.JPG style names
+(numbering continues across folders, as cameras do). Every JPEG carries a
+real APP1/Exif block and every RAW (.CR2) a real TIFF header, both with a
+DateTimeOriginal spread over --days days, so capture-date extraction does
+the same work as on a real card. A --raw-pairs fraction of the shots are
+RAW+JPEG pairs. Videos are MP4 files with a valid ftyp/mdat/moov layout
+and a creation time in mvhd; the mdat payload is a sparse hole, so multi-GB
+clips take no disk space or time to create (copying them still moves every
+byte through the copy backend).
+
+The same --seed and sizes always produce the same card. Payload bytes come
+from a seeded block, with per-file bytes at the start and end so no two
+files share content (the dedup sample hash sees them as distinct).
+"""
+import argparse, datetime, json, os, random, struct, sys
+
+MB = 1024 * 1024
+BLOCK = 1 * MB
+SHOTS_PER_FOLDER_MAX = 9999
+
+
+def tiff_block(dt, endian="<", signature=b"", make=b"Canon\x00", model=b"Canon EOS R5\x00"):
+    """Minimal TIFF: IFD0 (Make, Model, DateTime, ExifIFD) -> Exif IFD (DateTimeOriginal).
+
+    signature goes right after the 8-byte header (CR2 puts "CR" 2.0 there)
+    and pushes IFD0 back accordingly.
+    """
+    stamp = dt.strftime("%Y:%m:%d %H:%M:%S").encode() + b"\x00"
+    ifd0 = 8 + len(signature); n0 = 4
+    exif = ifd0 + 2 + n0 * 12 + 4; n1 = 1
+    strings = exif + 2 + n1 * 12 + 4
+    b = bytearray(b"II" if endian == "<" else b"MM")
+    b += struct.pack(endian + "HI", 42, ifd0) + signature
+    b += struct.pack(endian + "H", n0)
+    off = strings
+    b += struct.pack(endian + "HHII", 0x010F, 2, len(make), off); off += len(make)
+    b += struct.pack(endian + "HHII", 0x0110, 2, len(model), off); off += len(model)
+    b += struct.pack(endian + "HHII", 0x0132, 2, len(stamp), off); off += len(stamp)
+    b += struct.pack(endian + "HHII", 0x8769, 4, 1, exif)
+    b += struct.pack(endian + "I", 0)
+    b += struct.pack(endian + "H", n1) + struct.pack(endian + "HHII", 0x9003, 2, len(stamp), off)
+    b += struct.pack(endian + "I", 0)
+    b += make + model + stamp + stamp
+    return bytes(b)
+
+
+def jpeg_header(dt):
+    t = tiff_block(dt, ">")
+    app1 = b"\xff\xe1" + struct.pack(">H", len(t) + 8) + b"Exif\x00\x00" + t
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    return b"\xff\xd8" + app0 + app1 + b"\xff\xda\x00\x0c\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00"
+
+
+def cr2_header(dt):
+    return tiff_block(dt, "<", signature=b"CR\x02\x00" + struct.pack("<I", 0))
+
+
+def box(kind, payload):
+    return struct.pack(">I", len(payload) + 8) + kind + payload
+
+
+def mp4_parts(dt, payload_size):
+    """(head, mdat payload size, tail) of an MP4 whose mdat is left as a hole."""
+    secs = int((dt - datetime.datetime(1904, 1, 1)).total_seconds())
+    mvhd = box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">II", secs, secs) + struct.pack(">II", 1000, 0) + b"\x00" * 72)
+    moov = box(b"moov", mvhd)
+    ftyp = box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2avc1mp41")
+    if payload_size + 8 < 2 ** 32: mdat = struct.pack(">I", payload_size + 8) + b"mdat"
+    else: mdat = struct.pack(">I", 1) + b"mdat" + struct.pack(">Q", payload_size + 16)
+    return ftyp + mdat, payload_size, moov
+
+
+class CardSpec:
+    def __init__(self, seed=1, folders=2, shots=400, raw_pairs=0.5, jpeg_kb=6000, raw_mb=25.0,
+                 videos=2, video_gb=4.0, days=3):
+        self.seed = seed; self.folders = folders; self.shots = shots; self.raw_pairs = raw_pairs
+        self.jpeg_kb = jpeg_kb; self.raw_mb = raw_mb; self.videos = videos; self.video_gb = video_gb
+        self.days = days
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _write_payload(f, size, block, tag):
+    """Writes size bytes: tag, seeded block repeated, tag (per-file start and end)."""
+    f.write(tag); left = size - 2 * len(tag)
+    while left > 0:
+        n = min(left, len(block)); f.write(block[:n]); left -= n
+    f.write(tag)
+
+
+def generate(out, spec):
+    """Creates the card under out (skipped when the same spec is already there); returns a manifest."""
+    manifest_path = os.path.join(out, "card.json")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f: manifest = json.load(f)
+        if manifest.get("spec") == spec.as_dict(): return manifest
+    except (OSError, ValueError):
+        pass
+    rnd = random.Random(spec.seed)
+    block = rnd.randbytes(BLOCK)
+    start = datetime.datetime(2024, 6, 1, 8, 0, 0)
+    files = 0; total = 0
+    per_folder = max(1, min(SHOTS_PER_FOLDER_MAX, -(-spec.shots // max(1, spec.folders))))
+    shot = 0
+    for folder in range(max(1, spec.folders)):
+        d = os.path.join(out, "DCIM", f"{100 + folder}CANON")
+        os.makedirs(d, exist_ok=True)
+        for _ in range(per_folder):
+            if shot >= spec.shots: break
+            shot += 1
+            dt = start + datetime.timedelta(seconds=int(spec.days * 86400 * shot / max(1, spec.shots)))
+            tag = struct.pack(">QQ", spec.seed, shot)
+            name = f"IMG_{(shot - 1) % 9999 + 1:04d}"
+            head = jpeg_header(dt)
+            size = max(len(head) + 64, int(spec.jpeg_kb * 1024))
+            with open(os.path.join(d, name + ".JPG"), "wb") as f:
+                f.write(head); _write_payload(f, size - len(head) - 2, block, tag); f.write(b"\xff\xd9")
+            files += 1; total += size
+            if rnd.random() < spec.raw_pairs:
+                head = cr2_header(dt)
+                size = max(len(head) + 64, int(spec.raw_mb * MB))
+                with open(os.path.join(d, name + ".CR2"), "wb") as f:
+                    f.write(head); _write_payload(f, size - len(head), block, tag)
+                files += 1; total += size
+    video_dir = os.path.join(out, "DCIM", f"{100 + max(1, spec.folders) - 1}CANON")
+    for i in range(spec.videos):
+        dt = start + datetime.timedelta(hours=1 + i)
+        head, payload, tail = mp4_parts(dt, int(spec.video_gb * 1024 * MB))
+        path = os.path.join(video_dir, f"MVI_{i + 1:04d}.MP4")
+        with open(path, "wb") as f:
+            f.write(head); f.seek(payload, os.SEEK_CUR); f.write(tail)   # mdat queda como hueco disperso
+        files += 1; total += len(head) + payload + len(tail)
+    manifest = {"spec": spec.as_dict(), "files": files, "bytes": total}
+    with open(manifest_path, "w", encoding="utf-8") as f: json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def add_spec_arguments(ap):
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--folders", type=int, default=2, help="DCIM subfolders")
+    ap.add_argument("--shots", type=int, default=400, help="JPEG shots (each may also get a RAW)")
+    ap.add_argument("--raw-pairs", type=float, default=0.5, help="fraction of shots with a .CR2 twin")
+    ap.add_argument("--jpeg-kb", type=float, default=6000)
+    ap.add_argument("--raw-mb", type=float, default=25)
+    ap.add_argument("--videos", type=int, default=2)
+    ap.add_argument("--video-gb", type=float, default=4, help="size of each sparse MP4")
+    ap.add_argument("--days", type=float, default=3, help="capture dates spread over this many days")
+
+
+def spec_from_args(args):
+    return CardSpec(args.seed, args.folders, args.shots, args.raw_pairs, args.jpeg_kb, args.raw_mb,
+                    args.videos, args.video_gb, args.days)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("out")
+    add_spec_arguments(ap)
+    args = ap.parse_args()
+    m = generate(args.out, spec_from_args(args))
+    print(f"{args.out}: {m['files']} files, {m['bytes'] / MB:.1f} MB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
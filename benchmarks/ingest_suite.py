@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingest benchmark: every organize mode x every copy backend
+
+Usage:
+    python benchmarks/ingest_suite.py [--workdir DIR] [--dest DIR] [--modes ...] [--backends ...]
+                                      [--repeat 1] [--workers N] [--move] [--strace] [--json OUT]
+                                      [card options: --shots 400 --raw-mb 25 --video-gb 4 ...]
+
+A fake card (see fake_card.py, same options) is generated once in
+<workdir>/card. Each run is a fresh `python -m archivium ingest` process
+with its own empty destination and APPDATA (so config, import history and
+metadata cache never leak between runs), which means the numbers include
+interpreter startup, scan, capture-date reads, destination layout and copy,
+exactly as an ingest station runs them.
+
+Per run the report has files/s and MB/s (from the engine's own done event),
+wall time, peak RSS of the child (ru_maxrss), read/write syscall counts and
+bytes from /proc/<pid>/io (Linux) and, with --strace, the total syscall
+count from `strace -f -c`. --move moves a throwaway copy of the card instead
+of the card itself (that copy is not sparse, so keep --video-gb small). The JSON report also records the card spec and platform
+so results from different machines or commits can be compared.
+"""
+import argparse, json, os, platform, shutil, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)     # antes que benchmarks/, que también tiene un copy_backends.py
+from fake_card import MB, add_spec_arguments, generate, spec_from_args
+
+MODES = ("current", "date_then_type", "type_then_date")
+
+
+def available_backends():
+    from copy_backends import KERNEL_AVAILABLE
+    return ["kernel", "shutil"] if KERNEL_AVAILABLE else ["shutil"]
+
+
+def child_main(io_path, argv):
+    """Runs the CLI in-process, then saves /proc/self/io for the parent (it is gone after exit)."""
+    import archivium
+    try:
+        return archivium.main(argv)
+    finally:
+        try:
+            with open("/proc/self/io", "r") as f:
+                io = {k: int(v) for k, v in (line.split(":") for line in f)}
+            with open(io_path, "w", encoding="utf-8") as f: json.dump(io, f)
+        except OSError:
+            pass
+
+
+def parse_strace_total(path):
+    """Total call count from the summary table `strace -c` writes."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[-1] == "total":
+                    return int(parts[2] if len(parts) >= 5 else parts[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def run_once(card, dest, mode, backend, workers, move, use_strace, scratch):
+    appdata = tempfile.mkdtemp(prefix="appdata-", dir=scratch)
+    io_path = os.path.join(scratch, "io.json"); strace_path = os.path.join(scratch, "strace.txt")
+    for p in (io_path, strace_path):
+        if os.path.exists(p): os.remove(p)
+    argv = ["ingest", card, dest, "--mode", mode, "--backend", backend, "--all", "--progress-interval", "3600"]
+    if workers: argv += ["--workers", str(workers)]
+    if move: argv.append("--move")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", io_path, "--"] + argv
+    if use_strace: cmd = ["strace", "-f", "-c", "-o", strace_path] + cmd
+    env = dict(os.environ, APPDATA=appdata, PYTHONDONTWRITEBYTECODE="1")
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, env=env, cwd=ROOT)
+    out = proc.stdout.read()
+    _, status, ru = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    shutil.rmtree(appdata, ignore_errors=True)
+
+    done = {}
+    for line in out.decode("utf-8", "replace").splitlines():
+        try: ev = json.loads(line)
+        except ValueError: continue
+        if ev.get("event") in ("done", "error"): done = ev
+    result = {"mode": mode, "backend": backend, "exit": proc.returncode,
+              "files": done.get("files", 0), "failed": done.get("failed", 0),
+              "mb": round(done.get("bytes", 0) / MB, 1), "seconds": done.get("seconds", 0.0),
+              "wall_seconds": round(wall, 3),
+              "files_per_s": done.get("files_per_s", 0.0), "mb_per_s": done.get("mb_per_s", 0.0),
+              # ru_maxrss: KB en Linux, bytes en macOS
+              "peak_rss_mb": round(ru.ru_maxrss / (MB if sys.platform == "darwin" else 1024), 1)}
+    if done.get("event") == "error": result["error"] = done.get("message")
+    try:
+        with open(io_path, "r", encoding="utf-8") as f: io = json.load(f)
+        result.update(read_syscalls=io.get("syscr"), write_syscalls=io.get("syscw"),
+                      read_bytes=io.get("rchar"), written_bytes=io.get("wchar"))
+    except (OSError, ValueError):
+        pass
+    if use_strace: result["syscalls"] = parse_strace_total(strace_path)
+    return result
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        return child_main(sys.argv[2], sys.argv[4:])
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "archivium-ingest-bench"))
+    ap.add_argument("--dest", default=None, help="destination root (default: <workdir>/out)")
+    ap.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    ap.add_argument("--backends", nargs="+", choices=("kernel", "shutil"), default=None)
+    ap.add_argument("--repeat", type=int, default=1, help="runs per mode/backend (the report keeps all of them)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--move", action="store_true", help="benchmark moves (of a copy of the card)")
+    ap.add_argument("--strace", action="store_true", help="count every syscall with strace -f -c (slower)")
+    ap.add_argument("--json", default=None, help="report path (default: <workdir>/report.json)")
+    add_spec_arguments(ap)
+    args = ap.parse_args()
+    if args.strace and not shutil.which("strace"): ap.error("--strace needs strace on PATH")
+
+    spec = spec_from_args(args)
+    card = os.path.join(args.workdir, "card"); dest_root = args.dest or os.path.join(args.workdir, "out")
+    scratch = os.path.join(args.workdir, "scratch")
+    os.makedirs(dest_root, exist_ok=True); os.makedirs(scratch, exist_ok=True)
+    print("Generating card...")
+    manifest = generate(card, spec)
+    print(f"{manifest['files']} files, {manifest['bytes'] / MB:.1f} MB")
+
+    backends = args.backends or available_backends()
+    results = []
+    for mode in args.modes:
+        for backend in backends:
+            for _ in range(args.repeat):
+                dest = os.path.join(dest_root, f"{mode}-{backend}")
+                shutil.rmtree(dest, ignore_errors=True); os.makedirs(dest)
+                src = card
+                if args.move:
+                    src = os.path.join(scratch, "card-move")
+                    shutil.rmtree(src, ignore_errors=True); shutil.copytree(card, src)
+                r = run_once(src, dest, mode, backend, args.workers, args.move, args.strace, scratch)
+                shutil.rmtree(dest, ignore_errors=True)
+                results.append(r)
+                extra = f"  {r['syscalls']} syscalls" if r.get("syscalls") is not None else ""
+                print(f"{mode:<15} {backend:<7} {r['files']:>6} files  {r['seconds']:>8.2f}s  "
+                      f"{r['files_per_s']:>8.1f} files/s  {r['mb_per_s']:>8.1f} MB/s  "
+                      f"RSS {r['peak_rss_mb']:>6.1f} MB{extra}" + (f"  EXIT {r['exit']}" if r["exit"] else ""))
+    shutil.rmtree(scratch, ignore_errors=True)
+    report = {"card": manifest, "move": args.move, "workers": args.workers,
+              "platform": {"python": platform.python_version(), "system": platform.platform(),
+                           "cpus": os.cpu_count()},
+              "results": results}
+    out = args.json or os.path.join(args.workdir, "report.json")
+    with open(out, "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    print(f"Report: {out}")
+    return 1 if any(r["exit"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Process-wide configuration store.
+
+config.json is read once; afterwards reads are served from memory under a
+lock, so worker threads can read settings without touching the disk. Changes
+are written back after a short quiet period (several quick settings changes
+produce one write) through a temp file plus os.replace, so a crash never
+leaves a truncated config.json. Pending changes are flushed at exit.
+"""
+import atexit, json, os, threading
+
+DEFAULT_SAVE_DELAY = 0.5
+
+
+class ConfigStore:
+    def __init__(self, path, defaults, save_delay=DEFAULT_SAVE_DELAY):
+        self.path = path
+        self.defaults = dict(defaults)
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._data = None
+        self._timer = None
+        self._dirty = False
+        self._atexit = False
+
+    def _loaded(self):
+        if self._data is None:
+            data = {}
+            try:
+                with open(self.path, "r", encoding="utf-8") as f: data = json.load(f)
+                if not isinstance(data, dict): data = {}
+            except Exception:
+                pass
+            self._data = data
+        return self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            data = self._loaded()
+            if key in data: return data[key]
+        return default if default is not None else self.defaults.get(key)
+
+    def snapshot(self):
+        """Copy of defaults plus stored values; transfers keep it for the whole run."""
+        with self._lock:
+            return {**self.defaults, **self._loaded()}
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        with self._lock:
+            data = self._loaded()
+            changed = any(data.get(k, object()) != v for k, v in values.items())
+            data.update(values)
+            if changed: self._schedule()
+
+    def _schedule(self):
+        self._dirty = True
+        if self._timer: self._timer.cancel()
+        if self.save_delay <= 0:
+            self.flush(); return
+        self._timer = threading.Timer(self.save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+        if not self._atexit:
+            atexit.register(self.flush); self._atexit = True
+
+    def flush(self):
+        """Writes pending changes now (temp file + rename); False if the write failed."""
+        with self._lock:
+            if self._timer: self._timer.cancel(); self._timer = None
+            if not self._dirty: return True
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=2)
+                    f.flush(); os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self._dirty = False
+                return True
+            except OSError:     # queda pendiente para el próximo cambio o la salida
+                try: os.remove(tmp)
+                except OSError: pass
+                return False
+
+    def reload(self):
+        """Drops the in-memory copy (pending changes are written first)."""
+        with self._lock:
+            self.flush(); self._data = None
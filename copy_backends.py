@@ -0,0 +1,123 @@
+"""Selectable file copy backends for the transfer engine.
+
+- "shutil": shutil.copy2, the portable behaviour.
+- "kernel": Linux only. Tries a reflink (FICLONE, no data copied at all on
+  Btrfs/XFS/bcachefs), then copy_file_range, then sendfile, with a tunable
+  chunk size, so the data never passes through Python buffers. Anything the
+  kernel refuses falls back to a userspace copy of the remaining bytes.
+- "auto": "kernel" where available, "shutil" elsewhere.
+
+Every backend has copy2 semantics (data plus timestamps/permissions),
+accepts an existing destination file, which it truncates, and takes an
+optional on_bytes(n) callback invoked as data lands (per chunk for large
+files) so callers can report byte-accurate progress, and an optional size (the
+source's size from the scan) so the backend does not stat the source again. The callback may raise
+(the engine raises CopyCancelled once the run is cancelled) to stop a copy
+between two chunks; the partial destination is left for the caller to
+remove or resume.
+"""
+import errno, os, shutil, sys
+from functools import partial
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+USERSPACE_CHUNK_SIZE = 8 * 1024 * 1024
+# Below this size a file is copied in one call and reported once it is done
+PROGRESS_THRESHOLD = 32 * 1024 * 1024
+BACKENDS = ("auto", "kernel", "shutil")
+FICLONE = 0x40049409
+# Errors meaning "this syscall can't do this pair of files", not a real I/O failure
+_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP,
+                errno.EBADF, errno.ETXTBSY, errno.EPERM}
+
+KERNEL_AVAILABLE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+
+class CopyCancelled(Exception):
+    """Raised from an on_bytes callback to abort the copy in progress."""
+
+
+def _reflink(sfd, dfd):
+    try:
+        import fcntl
+        fcntl.ioctl(dfd, FICLONE, sfd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _kernel_loop(fn, sfd, dfd, size, chunk_size, on_bytes=None):
+    """Copies with fn(sfd, dfd, offset, count) until size; returns bytes copied."""
+    offset = 0
+    while offset < size:
+        try:
+            n = fn(sfd, dfd, offset, min(chunk_size, size - offset))
+        except OSError as e:
+            if e.errno in _UNSUPPORTED: return offset
+            raise
+        if n == 0: break
+        offset += n
+        if on_bytes: on_bytes(n)
+    return offset
+
+
+def _userspace_loop(fsrc, fdst, chunk_size, on_bytes=None):
+    buf = bytearray(chunk_size); view = memoryview(buf)
+    while True:
+        n = fsrc.readinto(buf)
+        if not n: break
+        fdst.write(view[:n])
+        if on_bytes: on_bytes(n)
+
+
+def _copy_file_range(sfd, dfd, offset, count):
+    return os.copy_file_range(sfd, dfd, count, offset, offset)
+
+
+def _sendfile(sfd, dfd, offset, count):
+    return os.sendfile(dfd, sfd, offset, count)
+
+
+def kernel_copyfile(src, dst, chunk_size=DEFAULT_CHUNK_SIZE, on_bytes=None, size=None):
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        sfd, dfd = fsrc.fileno(), fdst.fileno()
+        if size is None: size = os.fstat(sfd).st_size
+        if size and _reflink(sfd, dfd):
+            if on_bytes: on_bytes(size)
+            return "reflink"
+        done, how = 0, "userspace"
+        if hasattr(os, "copy_file_range"):
+            done = _kernel_loop(_copy_file_range, sfd, dfd, size, chunk_size, on_bytes); how = "copy_file_range"
+        if not done and size:
+            done = _kernel_loop(_sendfile, sfd, dfd, size, chunk_size, on_bytes); how = "sendfile"
+        if done < size:
+            if not done: how = "userspace"
+            fsrc.seek(done); fdst.seek(done)
+            _userspace_loop(fsrc, fdst, min(chunk_size, USERSPACE_CHUNK_SIZE), on_bytes)
+        return how
+
+
+def kernel_copy2(src, dst, chunk_size=DEFAULT_CHUNK_SIZE, on_bytes=None, size=None):
+    kernel_copyfile(src, dst, chunk_size, on_bytes, size)
+    shutil.copystat(src, dst)
+    return dst
+
+
+def shutil_copy2(src, dst, chunk_size=USERSPACE_CHUNK_SIZE, on_bytes=None, size=None):
+    """shutil.copy2, or a chunked copy with progress for large files."""
+    if size is None: size = os.path.getsize(src) if on_bytes else 0
+    if on_bytes is None or size < PROGRESS_THRESHOLD:
+        shutil.copy2(src, dst)
+        if on_bytes: on_bytes(size)
+        return dst
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        _userspace_loop(fsrc, fdst, min(chunk_size, USERSPACE_CHUNK_SIZE), on_bytes)
+    shutil.copystat(src, dst)
+    return dst
+
+
+def get_copy_backend(name="auto", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Returns copy(src, dst, on_bytes=None, size=None) for the named backend (unknown names mean "auto")."""
+    chunk_size = max(64 * 1024, int(chunk_size))
+    if name == "shutil" or not KERNEL_AVAILABLE:
+        return partial(shutil_copy2, chunk_size=chunk_size)
+    return partial(kernel_copy2, chunk_size=chunk_size)
@@ -0,0 +1,96 @@
+"""Content-level duplicate detection for a transfer run.
+
+Runs as the scan produces files, with a three-step cascade so unique files
+cost almost nothing:
+
+1. size: a file whose size no earlier file had is unique, no I/O at all;
+2. sample hash of the first and last 64 KB (files up to 128 KB are hashed
+   whole here, which settles them);
+3. full hash, only for files whose size and samples both matched.
+
+Originals are indexed by (size, sample digest) and (size, full digest), so a
+check costs a dict lookup however many earlier files share its size (fixed-
+size formats like uncompressed RAW put a whole card in one size), and every
+file is read at most once per step. Files are identified by their source path; locate(path) says where to read one now,
+since in move mode an earlier original may already have been renamed into
+the destination.
+"""
+import hashlib, os, threading
+
+SAMPLE_SIZE = 64 * 1024
+READ_CHUNK = 8 * 1024 * 1024
+DEDUP_ACTIONS = ("off", "skip", "hardlink")
+
+
+def _digest(): return hashlib.blake2b(digest_size=16)
+
+
+def sample_hash(path, size, sample=SAMPLE_SIZE):
+    h = _digest()
+    with open(path, "rb") as f:
+        if size <= 2 * sample:
+            h.update(f.read())
+        else:
+            h.update(f.read(sample)); f.seek(size - sample); h.update(f.read(sample))
+    return h.digest()
+
+
+def full_hash(path):
+    h = _digest()
+    buf = bytearray(READ_CHUNK); view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n: break
+            h.update(view[:n])
+    return h.digest()
+
+
+class DuplicateFinder:
+    def __init__(self, sample=SAMPLE_SIZE, locate=None):
+        self.sample = sample
+        self.locate = locate or (lambda path: path)
+        self._lock = threading.Lock()
+        self._unsampled = {}    # size -> only file of that size so far (not read yet)
+        self._by_sample = {}    # (size, sample digest) -> first original
+        self._by_full = {}      # (size, full digest) -> original
+        self._full_indexed = set()      # (size, sample digest) whose first original is in _by_full
+        self.io_bytes = 0       # bytes read for hashing
+
+    def _sample(self, path, size):
+        h = sample_hash(self.locate(path), size, self.sample)
+        self.io_bytes += min(size, 2 * self.sample)
+        return h
+
+    def _full_hash(self, path, size, sample):
+        if size <= 2 * self.sample: return sample       # la muestra ya es el contenido completo
+        h = full_hash(self.locate(path))
+        self.io_bytes += size
+        return h
+
+    def _index_sample(self, path, size):
+        try: self._by_sample.setdefault((size, self._sample(path, size)), path)
+        except OSError: pass        # ilegible: no puede ser el original de nadie
+
+    def check(self, path, size):
+        """Earlier path with identical content, or None (path is then remembered as an original)."""
+        if not size: return None
+        with self._lock:
+            if size not in self._unsampled:
+                self._unsampled[size] = path; return None
+            first = self._unsampled[size]
+            if first is not None:
+                self._unsampled[size] = None; self._index_sample(first, size)
+            try:
+                sample = self._sample(path, size)
+                key = (size, sample)
+                other = self._by_sample.setdefault(key, path)
+                if other == path: return None
+                if key not in self._full_indexed:
+                    self._full_indexed.add(key)
+                    try: self._by_full.setdefault((size, self._full_hash(other, size, sample)), other)
+                    except OSError: pass
+                other = self._by_full.setdefault((size, self._full_hash(path, size, sample)), path)
+                return None if other == path else other
+            except OSError:
+                return None     # ante la duda se copia: nunca se descarta un archivo ilegible como duplicado
@@ -0,0 +1,657 @@
+"""Transfer engine shared by every organize mode.
+
+Files are copied (or moved) by a pool of worker threads. Concurrency is capped
+globally and per device, so a slow card reader is not flooded with parallel
+reads while a fast NVMe destination still gets several writes in flight.
+
+Jobs are consumed lazily: the scan (and any metadata extraction) runs as the
+producer in the calling thread and hands each job to the workers through a
+bounded queue, so copying starts with the first classified file and the
+total time approaches max(scan, copy) instead of their sum.
+"""
+import os, threading, time
+from contextlib import contextmanager
+from functools import partial
+from copy_backends import DEFAULT_CHUNK_SIZE, CopyCancelled, get_copy_backend
+from transfer_report import TransferReport, now
+
+DEFAULT_WORKERS = 4
+DEFAULT_WORKERS_PER_SOURCE = 4
+DEFAULT_WORKERS_PER_DEST = 4
+DEFAULT_QUEUE_SIZE = 256
+
+JPEG_EXTS = frozenset({".jpg",".jpeg",".jpe",".jfif",".png",".gif",".bmp",".tiff",".tif",".webp",".ico",".svg",".heic",".heif"})
+RAW_EXTS = frozenset({".cr2",".cr3",".nef",".raf",".arw",".rw2",".dng",".orf",".sr2",".pef",".nrw"})
+VIDEO_EXTS = frozenset({".mp4",".mov",".avi",".mts",".mxf",".mpg",".mpeg",".mkv",".wmv",".3gp"})
+MEDIA_KINDS = ("JPEG", "RAW", "VIDEO")
+
+
+# Clases simples con __slots__ en lugar de dataclasses: importar dataclasses
+# (y con él inspect) costaba más que el resto del arranque de la CLI
+class CopyJob:
+    __slots__ = ("src", "dest_dir", "kind", "size", "mtime", "dest_path", "partial", "duplicate_of")
+
+    def __init__(self, src, dest_dir, kind=None, size=None, mtime=None, dest_path=None, partial=False,
+                 duplicate_of=None):
+        self.src = src; self.dest_dir = dest_dir; self.kind = kind; self.size = size; self.mtime = mtime
+        # Destino asignado (por el journal al reanudar, o al reclamar el nombre) y si hay una copia a medias
+        self.dest_path = dest_path; self.partial = partial
+        # CopyJob con el mismo contenido visto antes en esta ejecución (ver dedup.py)
+        self.duplicate_of = duplicate_of
+
+    def __repr__(self):
+        return f"CopyJob({self.src!r}, {self.dest_dir!r}, {self.kind!r}, {self.size!r})"
+
+
+class TransferStats:
+    __slots__ = ("files", "failed", "bytes", "elapsed", "duplicates")
+
+    def __init__(self, files=0, failed=0, bytes=0, elapsed=0.0, duplicates=0):
+        self.files = files; self.failed = failed; self.bytes = bytes; self.elapsed = elapsed
+        self.duplicates = duplicates
+
+    @property
+    def files_per_s(self):
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_s(self):
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.files} files, {self.bytes / (1024 * 1024):.1f} MB in {self.elapsed:.2f}s "
+                f"({self.files_per_s:.1f} files/s, {self.mb_per_s:.1f} MB/s)"
+                + (f", {self.duplicates} duplicates" if self.duplicates else "")
+                + (f", {self.failed} failed" if self.failed else ""))
+
+
+class ProgressSnapshot:
+    __slots__ = ("files_done", "files_total", "bytes_done", "bytes_total", "kind",
+                 "kind_bytes_done", "kind_bytes_total", "rate", "eta", "kind_eta", "scanning")
+
+    def __init__(self, files_done, files_total, bytes_done, bytes_total, kind,
+                 kind_bytes_done, kind_bytes_total, rate, eta, kind_eta, scanning):
+        self.files_done = files_done; self.files_total = files_total
+        self.bytes_done = bytes_done; self.bytes_total = bytes_total
+        self.kind = kind; self.kind_bytes_done = kind_bytes_done; self.kind_bytes_total = kind_bytes_total
+        self.rate = rate                # smoothed bytes/s
+        self.eta = eta                  # seconds, None until the rate is known
+        self.kind_eta = kind_eta
+        self.scanning = scanning        # totals still growing
+
+    @property
+    def fraction(self):
+        return min(1.0, self.bytes_done / self.bytes_total) if self.bytes_total else 0.0
+
+
+class ProgressTracker:
+    """Byte-level progress per category with an EWMA throughput estimate.
+
+    Totals come from the scan's stat results; done bytes are fed per chunk by
+    the copy backends. The rate is resampled at most every sample_interval
+    seconds so bursts of tiny files don't make the ETA jitter.
+    """
+
+    def __init__(self, alpha=0.3, sample_interval=0.5):
+        self.alpha = alpha; self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self.files_done = self.files_total = 0
+        self.bytes_done = self.bytes_total = 0
+        self.kind_done = {}; self.kind_total = {}
+        self.scanning = True
+        self.expected_files = self.expected_bytes = 0
+        self.rate = 0.0
+        self._sample_t = time.monotonic(); self._sample_bytes = 0
+
+    def add_job(self, kind, size):
+        with self._lock:
+            self.files_total += 1; self.bytes_total += size
+            self.kind_total[kind] = self.kind_total.get(kind, 0) + size
+
+    def expect(self, files, nbytes):
+        """Totals from a count pre-pass: shown while the scan is still discovering jobs."""
+        with self._lock: self.expected_files = files; self.expected_bytes = nbytes
+
+    def scan_finished(self):
+        with self._lock: self.scanning = False
+
+    def add_bytes(self, kind, n):
+        with self._lock:
+            self.bytes_done += n
+            self.kind_done[kind] = self.kind_done.get(kind, 0) + n
+            now = time.monotonic(); dt = now - self._sample_t
+            if dt >= self.sample_interval:
+                inst = (self.bytes_done - self._sample_bytes) / dt
+                self.rate = inst if not self.rate else self.alpha * inst + (1 - self.alpha) * self.rate
+                self._sample_t = now; self._sample_bytes = self.bytes_done
+
+    def file_done(self):
+        with self._lock: self.files_done += 1
+
+    def job_dropped(self, kind, size, copied=0):
+        """A failed or skipped job leaves the totals (and gives back partial bytes)."""
+        with self._lock:
+            self.files_total -= 1; self.bytes_total -= size; self.bytes_done -= copied
+            self.kind_total[kind] = self.kind_total.get(kind, 0) - size
+            self.kind_done[kind] = self.kind_done.get(kind, 0) - copied
+            self._sample_bytes -= copied
+
+    def snapshot(self, kind=None):
+        with self._lock:
+            kd, kt = self.kind_done.get(kind, 0), self.kind_total.get(kind, 0)
+            rate = self.rate
+            files_total, bytes_total, scanning = self.files_total, self.bytes_total, self.scanning
+            # Con un conteo previo el total ya se conoce; los archivos filtrados después lo corrigen al final
+            if scanning and self.expected_files:
+                files_total = max(files_total, self.expected_files); bytes_total = max(bytes_total, self.expected_bytes)
+                scanning = False
+            eta = (bytes_total - self.bytes_done) / rate if rate > 0 else None
+            kind_eta = (kt - kd) / rate if rate > 0 else None
+            return ProgressSnapshot(self.files_done, files_total, self.bytes_done, bytes_total,
+                                    kind, kd, kt, rate, eta, kind_eta, scanning)
+
+
+def get_file_type(file_path):
+    """Media category from the extension: "JPEG", "RAW", "VIDEO" or None."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in JPEG_EXTS: return "JPEG"
+    if ext in RAW_EXTS: return "RAW"
+    if ext in VIDEO_EXTS: return "VIDEO"
+    return None
+
+
+def scan_files(src, accept, cancel_event=None, report=None):
+    """Walks src once with scandir and yields (path, tag, stat) for every file accept(name) tags.
+
+    Depth-first in listing order, like os.walk; directory symlinks are not
+    followed and unreadable directories are skipped. The stat comes from the
+    DirEntry and is taken once per accepted file (on Windows the listing
+    already carries it), so downstream stages use it instead of statting
+    again. Stops early (without raising) when cancel_event is set; callers
+    check it. With a TransferReport, each directory is timed as a "scan" stage.
+    """
+    stack = [src]
+    while stack:
+        if cancel_event and cancel_event.is_set(): return
+        t0 = now()
+        found = []; subdirs = []
+        try:
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False): subdirs.append(e.path); continue
+                        tag = accept(e.name)
+                        if tag: found.append((e.path, tag, e.stat()))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+        if report: report.since("scan", t0)
+        yield from found
+
+
+def scan_media(src, cancel_event=None, report=None):
+    """(path, kind, stat) for every recognised media file under src; see scan_files."""
+    return scan_files(src, get_file_type, cancel_event, report)
+
+
+def count_media(src, cancel_event=None):
+    """(files, bytes) of the media under src: the optional count pre-pass."""
+    files = nbytes = 0
+    for _, _, st in scan_media(src, cancel_event):
+        files += 1; nbytes += st.st_size
+    return files, nbytes
+
+
+class NameIndex:
+    """Destination name resolution without per-file exists() probing.
+
+    Each destination directory is listed once with scandir; afterwards names
+    are resolved in memory. The next free _N suffix is remembered per base
+    name, so the 5th IMG_0001.JPG costs one lookup, not five stats. Names are
+    compared case-insensitively (exFAT/NTFS/APFS semantics). claim() creates
+    the file with O_EXCL, so even a concurrent writer outside this process
+    can never be overwritten: a lost race just moves on to the next suffix.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._taken = {}
+        self._next = {}
+
+    def _names(self, dest_dir):
+        names = self._taken.get(dest_dir)
+        if names is None:
+            try:
+                with os.scandir(dest_dir) as it: names = {e.name.casefold() for e in it}
+            except OSError:
+                names = set()
+            self._taken[dest_dir] = names
+        return names
+
+    def mark_empty(self, dest_dir):
+        """Registers a directory we just created, saving its scandir."""
+        with self._lock: self._taken.setdefault(dest_dir, set())
+
+    def _reserve(self, dest_dir, filename):
+        with self._lock:
+            names = self._names(dest_dir)
+            if filename.casefold() not in names:
+                names.add(filename.casefold()); return filename
+            base, ext = os.path.splitext(filename)
+            key = (dest_dir, base.casefold(), ext.casefold())
+            counter = self._next.get(key, 1)
+            while f"{base}_{counter}{ext}".casefold() in names: counter += 1
+            self._next[key] = counter + 1
+            name = f"{base}_{counter}{ext}"
+            names.add(name.casefold())
+            return name
+
+    def claim(self, dest_dir, filename):
+        """Reserves a free name in dest_dir and creates it empty; returns its path."""
+        while True:
+            path = os.path.join(dest_dir, self._reserve(dest_dir, filename))
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+                return path
+            except FileExistsError:
+                continue
+
+
+class DirCache:
+    """Destination directories already known to exist.
+
+    Each directory costs one makedirs for the whole run; freshly created ones
+    are reported to the NameIndex as empty so they are never listed either.
+    """
+
+    def __init__(self, names=None, report=None):
+        self._lock = threading.Lock()
+        self._ready = set()
+        self.names = names
+        self.report = report
+
+    def ensure(self, path):
+        if path in self._ready: return
+        with self._lock:
+            if path in self._ready: return
+            t0 = now()
+            try:
+                os.makedirs(path)
+                if self.names: self.names.mark_empty(path)
+            except FileExistsError:
+                if not os.path.isdir(path): raise
+            if self.report: self.report.since("makedirs", t0)
+            self._ready.add(path)
+
+    def materialize(self, paths):
+        for path in sorted(set(paths)): self.ensure(path)
+
+
+def prune_empty_dirs(dirs, root):
+    """Removes each dir in dirs and its ancestors while they are empty, never root itself."""
+    root = os.path.abspath(root)
+    for d in sorted({os.path.abspath(d) for d in dirs}, key=len, reverse=True):
+        while d != root and d.startswith(root + os.sep):
+            try: os.rmdir(d)
+            except OSError: break
+            d = os.path.dirname(d)
+
+
+def device_of(path):
+    """st_dev of path, or of its nearest existing ancestor (dest dirs may not exist yet)."""
+    path = os.path.abspath(path)
+    while True:
+        try: return os.stat(path).st_dev
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path: return None
+            path = parent
+
+
+class TransferEngine:
+    """Runs CopyJobs on a worker pool.
+
+    progress_cb(snapshot) receives a ProgressSnapshot after every file and,
+    for large files, at most every progress_interval seconds mid-copy.
+    progress_cb and log_cb are called from worker threads; callers that touch
+    UI must marshal them themselves.
+
+    Setting cancel_event stops copies in flight at their next chunk (one
+    copy_chunk_mb for the kernel backend, 8 MB otherwise, a verification
+    read-back included). With a journal their partial destinations are kept
+    so a resumed run completes them; without one they are deleted.
+
+    Stage timings and per-file outcomes accumulate in self.report (a
+    TransferReport, shared with the caller when one is passed in).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, workers_per_source=DEFAULT_WORKERS_PER_SOURCE,
+                 workers_per_dest=DEFAULT_WORKERS_PER_DEST, cancel_event=None, progress_cb=None, log_cb=None,
+                 queue_size=DEFAULT_QUEUE_SIZE, copy_fn=None, progress_interval=0.25,
+                 verify=None, verify_retries=2, verify_moves=True, journal=None, on_file_done=None,
+                 dedup_action="skip", report=None):
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.copy_fn = copy_fn or get_copy_backend()
+        self.progress_interval = progress_interval
+        self.progress = ProgressTracker()
+        self._last_emit = 0.0
+        self.workers_per_source = max(1, int(workers_per_source))
+        self.workers_per_dest = max(1, int(workers_per_dest))
+        self.cancel_event = cancel_event
+        self.progress_cb = progress_cb
+        self.log_cb = log_cb
+        # verify = algoritmo de hash: la copia pasa por espacio de usuario para
+        # poder hashear los bytes al vuelo, y un move solo borra el origen verificado
+        self.verify = verify
+        retries = max(0, int(verify_retries))
+        if verify:
+            from verify import verified_copy
+            self.copy_fn = partial(verified_copy, algorithm=verify, retries=retries, log=self._log)
+        # Un move entre dispositivos copia, verifica y borra el origen al final en bloque
+        self.move_copy_fn = self.copy_fn
+        if verify_moves and not verify:
+            from verify import DEFAULT_ALGORITHM, verified_copy
+            self.move_copy_fn = partial(verified_copy, algorithm=DEFAULT_ALGORITHM, retries=retries, log=self._log)
+        self._moved_sources = []
+        self._source_dirs = set()
+        self.journal = journal
+        self.on_file_done = on_file_done      # on_file_done(job), desde los hilos de copia
+        self.dedup_action = dedup_action
+        self._duplicates = []
+        self.stats = TransferStats()
+        self._lock = threading.Lock()
+        # Source and destination slots are distinct semaphores, always taken
+        # in the same order, so a device used as both can never deadlock.
+        self._src_slots = {}
+        self._dst_slots = {}
+        self._devices = {}
+        self.report = report or TransferReport()
+        self.names = NameIndex()
+        self.dirs = DirCache(self.names, self.report)
+
+    @classmethod
+    def from_config(cls, cfg, **kwargs):
+        return cls(workers=cfg.get("transfer_workers", DEFAULT_WORKERS),
+                   workers_per_source=cfg.get("workers_per_source", DEFAULT_WORKERS_PER_SOURCE),
+                   workers_per_dest=cfg.get("workers_per_dest", DEFAULT_WORKERS_PER_DEST),
+                   queue_size=cfg.get("pipeline_queue_size", DEFAULT_QUEUE_SIZE),
+                   copy_fn=get_copy_backend(cfg.get("copy_backend", "auto"),
+                                            cfg.get("copy_chunk_mb", DEFAULT_CHUNK_SIZE // (1024 * 1024)) * 1024 * 1024),
+                   verify=cfg.get("verify_algorithm", "xxhash") if cfg.get("verify_copies") else None,
+                   verify_retries=cfg.get("verify_retries", 2),
+                   verify_moves=cfg.get("verify_moves", True),
+                   dedup_action=cfg.get("dedup", "off"),
+                   **kwargs)
+
+    def cancelled(self):
+        return bool(self.cancel_event and self.cancel_event.is_set())
+
+    def _log(self, text):
+        if self.log_cb:
+            t0 = now(); self.log_cb(text); self.report.since("callbacks", t0)
+
+    def _device(self, path):
+        with self._lock:
+            if path in self._devices: return self._devices[path]
+        dev = device_of(path)
+        with self._lock: self._devices[path] = dev
+        return dev
+
+    def _slot(self, table, dev, limit):
+        with self._lock:
+            sem = table.get(dev)
+            if sem is None: sem = table[dev] = threading.BoundedSemaphore(limit)
+            return sem
+
+    @contextmanager
+    def _device_slots(self, job):
+        src_sem = self._slot(self._src_slots, self._device(os.path.dirname(job.src)), self.workers_per_source)
+        dst_sem = self._slot(self._dst_slots, self._device(job.dest_dir), self.workers_per_dest)
+        with src_sem, dst_sem:
+            yield
+
+    def _emit(self, kind, force=False):
+        if not self.progress_cb: return
+        t0 = now()
+        if not force and t0 - self._last_emit < self.progress_interval: return
+        self._last_emit = t0
+        self.progress_cb(self.progress.snapshot(kind))
+        self.report.since("callbacks", t0)
+
+    def _claim(self, job):
+        t0 = now()
+        path = self.names.claim(job.dest_dir, os.path.basename(job.src))
+        self.report.since("dest_name", t0)
+        return path
+
+    def _journal(self, op, *args):
+        t0 = now(); op(*args); self.report.since("journal", t0)
+
+    def _file_done(self, job):
+        if self.on_file_done:
+            t0 = now(); self.on_file_done(job); self.report.since("callbacks", t0)
+
+    def _same_device(self, job):
+        src_dev = self._device(os.path.dirname(job.src))
+        return src_dev is not None and src_dev == self._device(job.dest_dir)
+
+    def _rename_one(self, job):
+        """Same-device move as a single rename; returns the claimed path if the OS refuses it."""
+        dest_path = job.dest_path = job.dest_path or self._claim(job)
+        if self.journal: self._journal(self.journal.planned, job.src, dest_path, job.size)
+        t0 = now()
+        try:
+            os.replace(job.src, dest_path)
+        except OSError:
+            return dest_path        # p. ej. EXDEV entre montajes del mismo dispositivo: se copia
+        self.report.since("rename", t0)
+        if self.journal: self._journal(self.journal.completed, job.src, dest_path)
+        self._source_dirs.add(os.path.dirname(job.src))
+        return None
+
+    def defer_source_cleanup(self, src):
+        """Queues src for deletion in the end-of-run cleanup (its copy is already complete)."""
+        with self._lock: self._moved_sources.append(src)
+
+    def _settle_duplicates(self, move):
+        """Handles duplicates once their originals are in place: hard-link them to it or skip them.
+
+        A duplicate whose original failed is copied like any other file.
+        """
+        link_ok = True
+        for job in self._duplicates:
+            if self.cancelled(): break
+            orig = job.duplicate_of
+            try: in_place = bool(orig.dest_path) and os.path.getsize(orig.dest_path) == orig.size
+            except OSError: in_place = False
+            t0 = now()
+            try:
+                if not in_place:
+                    if self._transfer_one(job, move, None):
+                        with self._lock: self.stats.files += 1; self.stats.bytes += job.size
+                        self._file_done(job)
+                        self.report.file(job, "moved" if move else "copied", now() - t0)
+                    continue
+                outcome = "duplicate"
+                if self.dedup_action == "hardlink":
+                    dest_path = job.dest_path = self._claim(job)
+                    os.remove(dest_path)
+                    try:
+                        if not link_ok: raise OSError("hard links unsupported")
+                        os.link(orig.dest_path, dest_path)
+                    except OSError:
+                        # exFAT/FAT no admiten enlaces duros: se copia desde el destino ya escrito
+                        if link_ok: self._log("Hard links are not supported here, duplicates will be copied")
+                        link_ok = False
+                        self.copy_fn(orig.dest_path, dest_path)
+                    outcome = "hardlinked" if link_ok else "duplicate_copied"
+                if move: self.defer_source_cleanup(job.src)
+                with self._lock: self.stats.duplicates += 1
+                self._file_done(job)
+                self.report.file(job, outcome, now() - t0)
+            except Exception as e:
+                with self._lock: self.stats.failed += 1
+                self.report.file(job, "failed", now() - t0, str(e))
+                self._log(f"Error transferring {job.src}: {e}")
+        self._duplicates = []
+
+    def _complete_partial(self, job, dest_path, move, on_bytes):
+        from journal import complete_partial
+        offset = complete_partial(job.src, dest_path, on_bytes=on_bytes)
+        if offset: self._log(f"Resumed {os.path.basename(job.src)} at {offset / (1024 * 1024):.1f} MB")
+        verify = self.verify or (move and self.move_copy_fn is not self.copy_fn)
+        if verify:
+            from verify import DEFAULT_ALGORITHM, hash_file
+            algorithm = self.verify or DEFAULT_ALGORITHM
+            silent = (lambda n=0: on_bytes(0)) if on_bytes else None     # solo para la cancelación
+            if hash_file(job.src, algorithm, on_chunk=silent) != hash_file(dest_path, algorithm, uncached=True, on_chunk=silent):
+                self._log(f"Resumed copy of {os.path.basename(job.src)} did not verify, copying again")
+                (self.move_copy_fn if move else self.copy_fn)(job.src, dest_path, on_bytes=silent)
+
+    def _cleanup_sources(self, src_root=None):
+        """Deletes the sources of completed cross-device moves, then prunes emptied folders."""
+        # Los "done" de esas copias deben estar en disco antes de que el origen desaparezca
+        if self.journal and self._moved_sources: self.journal.sync()
+        for src in self._moved_sources:
+            try: os.remove(src)
+            except OSError as e: self._log(f"Cannot remove source {src}: {e}")
+            self._source_dirs.add(os.path.dirname(src))
+        if src_root: prune_empty_dirs(self._source_dirs, src_root)
+        self._moved_sources = []; self._source_dirs = set()
+
+    def _transfer_one(self, job, move, on_bytes, dest_path=None):
+        with self._device_slots(job):
+            if self.cancelled(): return False
+            if dest_path is None:
+                dest_path = job.dest_path or self._claim(job)
+            job.dest_path = dest_path
+            if self.journal: self._journal(self.journal.planned, job.src, dest_path, job.size)
+            t0 = now()
+            try:
+                if job.partial: self._complete_partial(job, dest_path, move, on_bytes)
+                # El tamaño del escaneo evita otro stat del origen en el backend
+                elif move: self.move_copy_fn(job.src, dest_path, on_bytes=on_bytes, size=job.size)
+                else: self.copy_fn(job.src, dest_path, on_bytes=on_bytes, size=job.size)
+                # El origen de un move solo se borra en _cleanup_sources, con la copia ya verificada
+                if move: self.defer_source_cleanup(job.src)
+            except CopyCancelled:
+                # With a journal the partial copy stays planned-but-not-done: resuming completes it
+                if not self.journal:
+                    try: os.remove(dest_path)
+                    except OSError: pass
+                raise
+            except BaseException:
+                # Only our own placeholder (or partial copy) lives at dest_path
+                try: os.remove(dest_path)
+                except OSError: pass
+                raise
+            self.report.since("copy", t0)
+            if self.journal: self._journal(self.journal.completed, job.src, dest_path)
+            return True
+
+    def run(self, jobs, move=False, dirs=(), src_root=None, expected=None):
+        """Transfers jobs; returns False if cancelled, True otherwise.
+
+        jobs may be a list or a lazy iterable. While a lazy producer is still
+        scanning, progress totals cover the jobs discovered so far
+        (snapshot.scanning is True). Job sizes come from the scan when it
+        provides them, otherwise from one stat in the producer. dirs, when
+        known up front, are created in one batch before copying; any other
+        destination directory is created by the producer the first time a job
+        targets it, so copy workers never touch directories.
+
+        With move=True, jobs whose source and destination share a device are
+        renamed right in the producer (no copy, no worker). The others are
+        copied and verified by the workers; their sources are deleted in one
+        cleanup pass after the copies finish, and folders left empty below
+        src_root (e.g. DCIM/100CANON) are removed.
+
+        expected, a (files, bytes) pair from count_media, gives progress real
+        totals while the scan is still running. Memory is bounded by
+        queue_size whatever the size of the source.
+        """
+        from concurrent.futures import ThreadPoolExecutor   # deferred: keeps CLI startup lean
+        self.stats = TransferStats()
+        self.progress = progress = ProgressTracker()
+        if expected: progress.expect(*expected)
+        start = time.monotonic()
+        # Bounds the jobs handed to the pool but not yet finished: the producer
+        # blocks here instead of buffering the whole source in memory.
+        slots = threading.BoundedSemaphore(self.queue_size)
+        self.dirs.materialize(dirs)
+        renamed_kind = None
+
+        report = self.report
+        done_outcome = "moved" if move else "copied"
+
+        def work(job, dest_path=None):
+            copied = 0
+            # Called per chunk, also during verification read-back: a cancel stops the copy mid-file
+            def on_bytes(n):
+                nonlocal copied
+                if self.cancelled(): raise CopyCancelled(job.src)
+                copied += n; progress.add_bytes(job.kind, n)
+                self._emit(job.kind)
+            t0 = now()
+            try:
+                if self.cancelled() or not self._transfer_one(job, move, on_bytes, dest_path):
+                    progress.job_dropped(job.kind, job.size, copied)
+                    report.file(job, "cancelled", now() - t0); return
+                progress.file_done()
+                with self._lock:
+                    self.stats.files += 1; self.stats.bytes += job.size
+                report.file(job, "resumed" if job.partial else done_outcome, now() - t0)
+                self._file_done(job)
+                self._emit(job.kind, force=True)
+            except CopyCancelled:
+                progress.job_dropped(job.kind, job.size, copied)
+                report.file(job, "cancelled", now() - t0)
+                if copied and self.journal:
+                    self._log(f"Cancelled {os.path.basename(job.src)} after {copied / (1024 * 1024):.1f} MB, "
+                              "the partial copy will be completed on resume")
+            except Exception as e:
+                progress.job_dropped(job.kind, job.size, copied)
+                with self._lock: self.stats.failed += 1
+                report.file(job, "failed", now() - t0, str(e))
+                self._log(f"Error transferring {job.src}: {e}")
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="archivium-copy") as pool:
+            for job in jobs:
+                if self.cancelled(): break
+                try:
+                    if job.size is None: job.size = os.path.getsize(job.src)
+                    self.dirs.ensure(job.dest_dir)
+                except OSError as e:
+                    with self._lock: self.stats.failed += 1
+                    report.file(job, "failed", 0.0, str(e))
+                    self._log(f"Cannot queue {job.src}: {e}")
+                    continue
+                if job.duplicate_of is not None:
+                    self._duplicates.append(job); continue
+                dest_path = None
+                if move and self._same_device(job):
+                    t0 = now()
+                    dest_path = self._rename_one(job)
+                    if dest_path is None:
+                        progress.add_job(job.kind, job.size); progress.add_bytes(job.kind, job.size)
+                        progress.file_done()
+                        with self._lock:
+                            self.stats.files += 1; self.stats.bytes += job.size
+                        report.file(job, "renamed", now() - t0)
+                        self._file_done(job)
+                        self._emit(job.kind); renamed_kind = job.kind
+                        continue
+                slots.acquire()
+                progress.add_job(job.kind, job.size)
+                pool.submit(work, job, dest_path)
+            progress.scan_finished()
+        if renamed_kind: self._emit(renamed_kind, force=True)
+        if self._duplicates: self._settle_duplicates(move)
+        if move: self._cleanup_sources(src_root)
+        self.stats.elapsed = time.monotonic() - start
+        return not self.cancelled()
@@ -0,0 +1,111 @@
+"""Per-card, per-destination history of imported files, for "only new files" imports.
+
+Each source volume is identified by its filesystem serial/UUID (the FAT/exFAT
+volume serial on camera cards, so formatting a card starts a fresh history).
+Files are fingerprinted by (path relative to the volume root, size, mtime in
+whole seconds, since FAT only stores 2 s resolution) and each fingerprint is
+stored as 8 bytes of BLAKE2b in
+APPDATA_DIR/import_history/<volume>-<destination hash>.bin, an append-only
+file that is loaded into a set: 40k files cost 320 KB. Importing the same
+card into another destination library therefore copies everything again.
+"""
+import hashlib, os, threading
+
+FINGERPRINT_SIZE = 8
+
+
+def volume_root(path):
+    path = os.path.abspath(path)
+    while not os.path.ismount(path):
+        parent = os.path.dirname(path)
+        if parent == path: break
+        path = parent
+    return path
+
+
+def _windows_serial(root):
+    try:
+        import ctypes
+        serial = ctypes.c_uint32()
+        if ctypes.windll.kernel32.GetVolumeInformationW(ctypes.c_wchar_p(root), None, 0, ctypes.byref(serial),
+                                                        None, None, None, 0):
+            return f"{serial.value:08X}"
+    except Exception:
+        pass
+    return None
+
+
+def _linux_uuid(root):
+    try:
+        dev = os.stat(root).st_dev
+        with os.scandir("/dev/disk/by-uuid") as it:
+            for e in it:
+                try:
+                    if os.stat(e.path).st_rdev == dev: return e.name
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return None
+
+
+def volume_id(path):
+    """Stable identifier of the volume holding path (serial/UUID, else a hash of its mount point)."""
+    root = volume_root(path)
+    vid = _windows_serial(root) if os.name == "nt" else _linux_uuid(root)
+    if vid: return vid
+    return "mount-" + hashlib.blake2b(root.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+def fingerprint(rel_path, size, mtime):
+    key = f"{rel_path}\0{size}\0{int(mtime)}".encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(key, digest_size=FINGERPRINT_SIZE).digest()
+
+
+def destination_id(dest_root):
+    """Short hash of a destination library's absolute path (case-insensitive on Windows)."""
+    path = os.path.normcase(os.path.abspath(dest_root))
+    return hashlib.blake2b(path.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+class ImportHistory:
+    """Fingerprints of files already imported from one volume into one destination root."""
+
+    def __init__(self, history_dir, src, dest_root):
+        self.root = volume_root(src)
+        self.volume = volume_id(src)
+        self.path = os.path.join(history_dir, f"{self.volume}-{destination_id(dest_root)}.bin")
+        self._lock = threading.Lock()
+        self._f = None
+        self.seen = set()
+        try:
+            with open(self.path, "rb") as f: data = f.read()
+            end = len(data) - len(data) % FINGERPRINT_SIZE     # ignora un registro truncado
+            self.seen = {data[i:i + FINGERPRINT_SIZE] for i in range(0, end, FINGERPRINT_SIZE)}
+        except OSError:
+            pass
+
+    def key(self, path, size, mtime):
+        rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return fingerprint(rel, size, mtime)
+
+    def __contains__(self, key):
+        return key in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+    def add(self, key):
+        with self._lock:
+            if key in self.seen: return
+            if self._f is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._f = open(self.path, "ab")
+                tail = self._f.tell() % FINGERPRINT_SIZE
+                if tail: self._f.truncate(self._f.tell() - tail)
+            self._f.write(key)
+            self.seen.add(key)
+
+    def close(self):
+        with self._lock:
+            if self._f: self._f.close(); self._f = None
@@ -0,0 +1,384 @@
+"""Ingest orchestration shared by the GUI and the command line.
+
+Nothing here imports tkinter, customtkinter or PIL: an Ingest runs the same
+scan → classify → transfer pipeline for every organize mode and reports
+through plain callbacks (log_cb(text), progress_cb(ProgressSnapshot)).
+"""
+import datetime, os, re, threading
+from config_store import ConfigStore
+from engine import JPEG_EXTS, RAW_EXTS, VIDEO_EXTS, CopyJob, TransferEngine, count_media, scan_media
+from import_history import ImportHistory
+from journal import TransferJournal, discard_interrupted, find_resumable
+from transfer_report import TransferReport, now
+
+APP_ID = "Archivium"
+APPDATA_DIR = os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), APP_ID)
+CONFIG_PATH = os.path.join(APPDATA_DIR, "config.json")
+METADATA_CACHE_PATH = os.path.join(APPDATA_DIR, "metadata_cache.sqlite3")
+IMPORT_HISTORY_DIR = os.path.join(APPDATA_DIR, "import_history")
+REPORTS_DIR = os.path.join(APPDATA_DIR, "reports")
+DEFAULT_CONFIG = {"default_dest": "", "theme": "system", "organize_mode": "current",
+                  "transfer_workers": 4, "workers_per_source": 4, "workers_per_dest": 4,
+                  "pipeline_queue_size": 256, "copy_backend": "auto", "copy_chunk_mb": 64,
+                  "verify_copies": False, "verify_algorithm": "xxhash", "verify_retries": 2, "verify_moves": True,
+                  "skip_imported": True, "dedup": "off", "transfer_reports": 20, "scan_count_first": False,
+                  "metadata_cache_entries": 250_000,
+                  "log_capacity": 2000, "log_file_max_mb": 5, "log_file_backups": 3}
+MODES = ("current", "date_then_type", "type_then_date")
+
+# Patrones de robocopy a partir de las extensiones del motor: una sola lista que mantener
+ROBOCOPY_PATTERNS = {kind: sorted("*" + ext for ext in exts)
+                     for kind, exts in (("JPEG", JPEG_EXTS), ("RAW", RAW_EXTS), ("VIDEO", VIDEO_EXTS))}
+
+
+# Configuración compartida por todo el proceso: se lee una vez y se guarda con retardo
+config = ConfigStore(CONFIG_PATH, DEFAULT_CONFIG)
+
+def ensure_appdata(): os.makedirs(APPDATA_DIR, exist_ok=True)
+
+def load_config():
+    """Snapshot of the current configuration (defaults filled in)."""
+    return config.snapshot()
+
+def today_str(): return datetime.date.today().strftime("%Y-%m-%d")
+
+def next_sequence_folder(base):
+    date_str = today_str(); prefix = date_str+"_"; seq = 1
+    try:
+        existing = [d for d in os.listdir(base) if os.path.isdir(os.path.join(base,d)) and d.startswith(prefix)]
+        if existing:
+            nums = []; pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$")
+            for d in existing:
+                m = pattern.match(d)
+                if m: nums.append(int(m.group(1)))
+            if nums: seq = max(nums) + 1
+    except Exception: pass
+    return os.path.join(base, f"{prefix}{seq:02d}")
+
+def prepare_destination(dest, mode, resume=False, src=None):
+    """Output base for a run: a new YYYY-MM-DD_NN session folder in Classic mode, dest otherwise.
+
+    With resume, the session of the latest interrupted run from src is reused when there is one;
+    otherwise that interrupted run is retired and its partial copies deleted.
+    """
+    if resume:
+        base = find_resumable(dest, mode, src)
+        if base: return base
+    discard_interrupted(dest, mode, src)
+    if mode != "current": return dest
+    session_dir = next_sequence_folder(dest)
+    os.makedirs(session_dir, exist_ok=True)
+    return session_dir
+
+_robocopy = None
+
+def robocopy_available():
+    global _robocopy
+    if _robocopy is None:
+        import subprocess
+        try: subprocess.run(["robocopy", "/?"], capture_output=True, check=False); _robocopy = True
+        except Exception: _robocopy = False
+    return _robocopy
+
+
+class Ingest:
+    """One transfer run: configuration snapshot, cancel flag, callbacks and last stats."""
+
+    def __init__(self, cfg=None, cancel_event=None, log_cb=None, progress_cb=None):
+        self.cfg = cfg if cfg is not None else load_config()
+        self.cancel_event = cancel_event or threading.Event()
+        self.log_cb = log_cb
+        self.progress_cb = progress_cb
+        self.stats = None
+        self.report = TransferReport(REPORTS_DIR if self.cfg.get("transfer_reports", DEFAULT_CONFIG["transfer_reports"]) else None)
+        self.report_path = None
+        self.journal = None
+        self.history = None
+        self.engine = None
+        self.robocopy = False
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def log(self, text):
+        if self.log_cb: self.log_cb(text)
+
+    def open_metadata_cache(self):
+        from metadata import MetadataCache
+        try:
+            ensure_appdata()
+            return MetadataCache(METADATA_CACHE_PATH, self.cfg.get("metadata_cache_entries", DEFAULT_CONFIG["metadata_cache_entries"]))
+        except Exception as e:
+            self.log(f"Metadata cache unavailable: {e}")
+            return None
+
+    # Ejecuta los trabajos de copia en el motor multihilo y reporta el rendimiento
+    def run_transfer_jobs(self, jobs, move=False, dirs=(), src_root=None):
+        on_file_done = self.remember_imported if self.history is not None else None
+        engine = self.engine = TransferEngine.from_config(self.cfg, cancel_event=self.cancel_event, progress_cb=self.progress_cb,
+                                                          log_cb=self.log_cb, journal=self.journal, on_file_done=on_file_done,
+                                                          report=self.report)
+        if self.history is not None: jobs = self.new_jobs_only(jobs)
+        if self.journal and (self.journal.state.done or self.journal.state.pending):
+            jobs = self.resume_jobs(jobs, move)
+        if self.cfg.get("dedup", "off") in ("skip", "hardlink"): jobs = self.mark_duplicates(jobs)
+        expected = None
+        if self.cfg.get("scan_count_first") and src_root:
+            expected = count_media(src_root, self.cancel_event)
+            self.log(f"Found {expected[0]} media files ({expected[1] / (1024 ** 3):.2f} GB) on the source")
+        ok = engine.run(jobs, move, dirs, src_root, expected)
+        self.stats = engine.stats
+        if engine.stats.files or engine.stats.failed: self.log(f"Transferred {engine.stats.summary()}")
+        return ok
+
+    def open_history(self, src, dest_root):
+        try:
+            history = ImportHistory(IMPORT_HISTORY_DIR, src, dest_root)
+        except OSError as e:
+            self.log(f"Import history unavailable: {e}")
+            return None
+        if len(history): self.log(f"Card {history.volume}: {len(history)} files imported into this destination before will be skipped")
+        return history
+
+    # Importación incremental: solo pasan los archivos cuya huella no está en el historial de la tarjeta
+    def new_jobs_only(self, jobs):
+        skipped = 0
+        for job in jobs:
+            if job.size is None or job.mtime is None:
+                try: st = os.stat(job.src)
+                except OSError:
+                    yield job; continue
+                job.size = st.st_size; job.mtime = st.st_mtime
+            if self.history.key(job.src, job.size, job.mtime) in self.history:
+                self.report.file(job, "already_imported"); skipped += 1; continue
+            yield job
+        if skipped: self.log(f"Skipped {skipped} files already imported from this card")
+
+    # Deduplicación: cada archivo se compara solo con los anteriores de igual tamaño
+    def mark_duplicates(self, jobs):
+        from dedup import DuplicateFinder
+        originals = {}; found = 0
+        # Con move, un original del mismo dispositivo ya se renombró al destino: se lee allí
+        def locate(src):
+            job = originals.get(src)
+            if job is None or job.dest_path is None or os.path.exists(src): return src
+            return job.dest_path
+        finder = DuplicateFinder(locate=locate)
+        for job in jobs:
+            if job.size is None:
+                try: job.size = os.path.getsize(job.src)
+                except OSError:
+                    yield job; continue
+            t0 = now()
+            other = finder.check(job.src, job.size)
+            self.report.since("dedup", t0)
+            if other is None: originals[job.src] = job
+            else:
+                job.duplicate_of = originals[other]; found += 1
+            yield job
+        if found:
+            self.log(f"Found {found} duplicate files ({finder.io_bytes / (1024 * 1024):.1f} MB read to compare)")
+
+    def remember_imported(self, job):
+        if job.mtime is None: return
+        self.history.add(self.history.key(job.src, job.size, job.mtime))
+
+    @staticmethod
+    def same_size(job, dest_path):
+        try:
+            return os.path.getsize(dest_path) == (job.size if job.size is not None else os.path.getsize(job.src))
+        except OSError:
+            return False
+
+    # Al reanudar: salta lo ya transferido y retoma las copias a medias en su destino original
+    def resume_jobs(self, jobs, move=False):
+        skipped = partial = 0
+        for job in jobs:
+            status, dest_path = self.journal.lookup(job.src)
+            # Solo cuenta como hecho si el destino sigue ahí con el tamaño del origen; si no, se copia con un nombre nuevo
+            if status == "done" and self.same_size(job, dest_path):
+                job.dest_path = dest_path; self.report.file(job, "already_done")
+                skipped += 1
+                # Un move interrumpido antes de la limpieza deja el origen: se borra al final
+                if move: self.engine.defer_source_cleanup(job.src)
+                continue
+            if status == "partial" and os.path.exists(dest_path):
+                partial += 1
+                job.dest_dir = os.path.dirname(dest_path); job.dest_path = dest_path; job.partial = True
+            yield job
+        if skipped or partial:
+            self.log(f"Resuming: {skipped} files already transferred, {partial} partial files to complete")
+
+    @staticmethod
+    def remove_robocopy_partials(dirpath, dest, patterns):
+        """After terminating robocopy: deletes the file it left half-written in dest.
+
+        robocopy stamps a copy with the source's size and mtime only once it is
+        complete, so a destination that differs in either is the cut-off one.
+        """
+        try:
+            with os.scandir(dirpath) as it:
+                for e in it:
+                    if not e.is_file() or "*" + os.path.splitext(e.name)[1].lower() not in patterns: continue
+                    target = os.path.join(dest, e.name)
+                    try:
+                        st, dt = e.stat(), os.stat(target)
+                        # FAT guarda el mtime con resolución de 2 s
+                        if dt.st_size != st.st_size or abs(dt.st_mtime - st.st_mtime) > 2: os.remove(target)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+    def transfer_with_robocopy(self, dirs, dest, patterns):
+        import subprocess
+        os.makedirs(dest, exist_ok=True)
+        overall_success = True
+        for dirpath in dirs:
+            if self.cancelled(): return False
+            cmd = ["robocopy", dirpath, dest] + patterns
+            cmd.extend(["/R:3", "/W:1", "/NP", "/NDL", "/NFL"])
+            try:
+                # Popen en lugar de run: una cancelación termina robocopy sin esperar a que acabe la carpeta
+                proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                while True:
+                    try: returncode = proc.wait(timeout=0.2); break
+                    except subprocess.TimeoutExpired:
+                        if self.cancelled():
+                            proc.terminate(); proc.wait()
+                            self.remove_robocopy_partials(dirpath, dest, patterns)
+                            return False
+                if returncode >= 8: overall_success = False
+            except Exception: overall_success = False
+        return overall_success
+
+    # Transfiere agrupando por fecha→tipo o tipo→fecha
+    def transfer_grouped(self, src, dest, move=False, mode="date_then_type"):
+        from metadata import get_capture_date
+        cache = self.open_metadata_cache()
+        # El escaneo y la lectura de fechas alimentan la copia a medida que se clasifica cada archivo
+        def jobs():
+            for fp, typ, st in scan_media(src, self.cancel_event, self.report):
+                t0 = now()
+                date_str = get_capture_date(fp, cache, typ, st)
+                self.report.since("capture_date", t0)
+                if mode == "date_then_type":
+                    dest_dir = os.path.join(dest, date_str, typ)
+                else:
+                    dest_dir = os.path.join(dest, typ, date_str)
+                yield CopyJob(fp, dest_dir, typ, st.st_size, st.st_mtime)
+        try:
+            return self.run_transfer_jobs(jobs(), move, src_root=src)
+        finally:
+            if cache: cache.close()
+
+    # Modo clásico: un único recorrido del origen reparte cada archivo a JPEG/RAW/VIDEO
+    def transfer_classic(self, src, session_dir, move=False):
+        dest_dirs = {kind: os.path.join(session_dir, kind) for kind in ("JPEG", "RAW", "VIDEO")}
+        if self.robocopy:
+            for d in dest_dirs.values(): os.makedirs(d, exist_ok=True)
+            # robocopy trabaja por carpeta: basta con saber qué carpetas contienen cada tipo
+            dirs_by_kind = {kind: {} for kind in dest_dirs}
+            for fp, kind, _ in scan_media(src, self.cancel_event, self.report):
+                dirs_by_kind[kind].setdefault(os.path.dirname(fp), None)
+            if self.cancelled(): return False
+            success = True
+            for kind, dirs in dirs_by_kind.items():
+                if not dirs: continue
+                self.log(f"Transferring {kind} files...")
+                if not self.transfer_with_robocopy(list(dirs), dest_dirs[kind], ROBOCOPY_PATTERNS[kind]):
+                    if not self.cancelled(): self.log(f"Failed to transfer {kind} files")
+                    success = False
+            return success
+        jobs = (CopyJob(fp, dest_dirs[kind], kind, st.st_size, st.st_mtime)
+                for fp, kind, st in scan_media(src, self.cancel_event, self.report))
+        return self.run_transfer_jobs(jobs, move, dirs=dest_dirs.values(), src_root=src)
+
+    def open_journal(self, src, out_base, mode, move, resume):
+        try:
+            self.journal = TransferJournal(out_base, src, mode, move, resume)
+            if self.journal.refused:
+                self.log(f"The interrupted transfer in {out_base} was reading from another source; starting a new transfer")
+        except OSError as e:
+            self.log(f"Transfer journal unavailable, this run cannot be resumed: {e}")
+            self.journal = None
+
+    def use_robocopy(self, mode, move):
+        """Whether a Windows Classic-mode run can be left to robocopy.
+
+        robocopy bypasses the engine, so it is only used for plain copies: a
+        move, the import history, verification or dedup all need the engine.
+        """
+        return (mode == "current" and os.name == 'nt' and not move and self.history is None
+                and not self.cfg.get("verify_copies") and self.cfg.get("dedup", "off") == "off"
+                and robocopy_available())
+
+    def run(self, src, out_base, mode="current", move=False, resume=False):
+        """Transfers src into out_base (see prepare_destination); returns True on success.
+
+        Every run keeps a journal in out_base; resume=True continues the run
+        recorded there instead of starting over.
+        """
+        self.log(f"{'Resuming' if resume else 'Starting'} transfer from {src} to {out_base}")
+        self.log(f"Mode: {'Move' if move else 'Copy'}")
+        # Con move los archivos salen de la tarjeta: no hay nada que recordar
+        if self.cfg.get("skip_imported", True) and not move:
+            # El historial es por destino: en modo clásico, la carpeta que contiene las sesiones
+            self.history = self.open_history(src, os.path.dirname(out_base) if mode == "current" else out_base)
+        self.robocopy = self.use_robocopy(mode, move)
+        if self.robocopy:
+            self.log("Copying with robocopy: no journal, verification, per-file report or byte progress for this run")
+        else:
+            self.open_journal(src, out_base, mode, move, resume)
+        success = False
+        try:
+            success = self.run_mode(src, out_base, mode, move)
+        finally:
+            if self.journal:
+                failed = self.stats.failed if self.stats else 0
+                self.journal.close(finished=success and not failed)
+            if self.history is not None: self.history.close()
+            self.write_report(src, out_base, mode, move, success)
+        if success and mode == "current" and self.stats and not self.stats.files:
+            self.remove_empty_session(out_base)
+        return success
+
+    def write_report(self, src, out_base, mode, move, success):
+        """Saves the timing/outcome report of this run in REPORTS_DIR (transfer_reports = how many to keep)."""
+        keep = self.cfg.get("transfer_reports", DEFAULT_CONFIG["transfer_reports"])
+        if not keep: return
+        stats = self.stats
+        try:
+            self.report_path = self.report.write(
+                keep, src=os.path.abspath(src), dest=os.path.abspath(out_base), mode=mode, move=bool(move),
+                success=bool(success), cancelled=self.cancelled(),
+                copy_backend=self.cfg.get("copy_backend", "auto"), workers=self.cfg.get("transfer_workers"),
+                totals={"files": stats.files, "failed": stats.failed, "duplicates": stats.duplicates,
+                        "bytes": stats.bytes, "seconds": round(stats.elapsed, 3),
+                        "files_per_s": round(stats.files_per_s, 1), "mb_per_s": round(stats.mb_per_s, 1)} if stats else None)
+            self.log(f"Transfer report: {self.report_path}")
+        except OSError as e:
+            self.log(f"Cannot write transfer report: {e}")
+
+    # Una tarjeta sin archivos nuevos no deja carpetas de sesión vacías
+    def remove_empty_session(self, session_dir):
+        try:
+            for kind in ("JPEG", "RAW", "VIDEO"): os.rmdir(os.path.join(session_dir, kind))
+            os.rmdir(session_dir)
+            self.log(f"No new files; removed empty session folder {session_dir}")
+        except OSError:
+            pass
+
+    def run_mode(self, src, out_base, mode, move):
+        if mode == "current":
+            success = self.transfer_classic(src, out_base, move)
+            if not success and not self.cancelled():
+                self.log("Failed to transfer files")
+        else:
+            self.log(f"Transfiriendo en modo '{mode}'...")
+            # Para modos avanzados se usa transferencia Python agrupada
+            m = "date_then_type" if mode == "date_then_type" else "type_then_date"
+            success = self.transfer_grouped(src, out_base, move, mode=m)
+            if not success and not self.cancelled():
+                self.log("Failed to transfer grouped files")
+        return success and not self.cancelled()
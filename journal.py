@@ -0,0 +1,257 @@
+"""Write-ahead journal that makes an interrupted transfer resumable.
+
+One JSON object per line in <output base>/.archivium-journal.jsonl:
+
+    {"op": "session", "src": ..., "volume": ..., "src_rel": ..., "mode": ..., "move": ...}
+    {"op": "plan", "src": "DCIM/100CANON/IMG_0001.JPG", "dest": "JPEG/IMG_0001.JPG", "size": ...}
+    {"op": "done", "src": "DCIM/100CANON/IMG_0001.JPG", "dest": "JPEG/IMG_0001.JPG"}
+
+A file is planned (with the destination name it was given) before any byte
+is written and marked done once it is complete (and verified, when
+verification is on). Paths are relative to the source and output roots, so
+a card mounted under another drive letter still matches. The session header
+records the source's volume (see import_history.volume_id) and its folder
+relative to the volume root, and a journal is only resumed from the same
+source. A run that finishes without cancellation or failures deletes its
+journal; otherwise resuming the run skips done files, reuses the planned
+names and completes partial copies instead of restarting them. Starting a new
+run instead retires the interrupted one: the partial copies it had planned
+are deleted along with its journal.
+"""
+import json, os, re, shutil, threading, time
+from import_history import volume_id, volume_root
+
+JOURNAL_NAME = ".archivium-journal.jsonl"
+# Bytes re-read from both sides before appending to a partial copy
+RESUME_OVERLAP = 1024 * 1024
+FSYNC_INTERVAL = 1.0
+SESSION_RE = re.compile(r"^\d{4}-\d{2}-\d{2}_\d+$")
+
+
+def journal_path(out_base):
+    return os.path.join(out_base, JOURNAL_NAME)
+
+
+class JournalState:
+    """What an existing journal says: its header, done files and planned-but-unfinished files."""
+
+    def __init__(self, header=None, done=None, pending=None, sizes=None):
+        self.header = header or {}
+        self.done = done or {}          # src rel -> dest rel
+        self.pending = pending or {}    # src rel -> dest rel
+        self.sizes = sizes or {}        # src rel -> size recorded when it was planned
+
+
+def source_key(src):
+    """(volume, folder relative to the volume root) identifying a source across drive letters."""
+    rel = os.path.relpath(os.path.abspath(src), volume_root(src)).replace(os.sep, "/")
+    return volume_id(src), rel
+
+
+def matches_source(header, src):
+    """True when a session header was written for src (headers without a volume never match)."""
+    return "volume" in header and (header["volume"], header.get("src_rel")) == source_key(src)
+
+
+def read_header(path):
+    """Session header of a journal (its first line), or None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f: rec = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    return rec if isinstance(rec, dict) and rec.get("op") == "session" else None
+
+
+def read_journal(path):
+    state = JournalState()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try: rec = json.loads(line)
+                except ValueError: continue     # última línea truncada por un cierre abrupto
+                op = rec.get("op")
+                if op == "session": state.header = rec
+                elif op == "plan":
+                    state.pending[rec["src"]] = rec["dest"]; state.sizes[rec["src"]] = rec.get("size")
+                elif op == "done":
+                    state.pending.pop(rec["src"], None); state.done[rec["src"]] = rec["dest"]
+    except OSError:
+        return None
+    return state
+
+
+def _resumable(header, mode, src):
+    return header is not None and header.get("mode") == mode and (src is None or matches_source(header, src))
+
+
+def _resumable_sessions(dest, mode, src):
+    """(journal mtime, session folder) of every interrupted Classic-mode session in dest."""
+    sessions = []
+    try:
+        with os.scandir(dest) as it:
+            for e in it:
+                if e.is_dir() and SESSION_RE.match(e.name):
+                    path = journal_path(e.path)
+                    try: mtime = os.stat(path).st_mtime
+                    except OSError: continue
+                    if _resumable(read_header(path), mode, src): sessions.append((mtime, e.path))
+    except OSError:
+        pass
+    return sessions
+
+
+def find_resumable(dest, mode, src=None):
+    """Output base of the most recent interrupted run for dest and mode, or None.
+
+    With src, only a run that was reading from that same source qualifies.
+    """
+    if mode != "current":
+        return dest if _resumable(read_header(journal_path(dest)), mode, src) else None
+    sessions = _resumable_sessions(dest, mode, src)
+    return max(sessions)[1] if sessions else None
+
+
+def _is_partial(state, src_rel, dest):
+    """A planned file is only a disposable partial copy while its source still exists or it is
+    shorter than planned: a same-device move interrupted between rename and "done" leaves the
+    only copy of the file at dest."""
+    src_root = state.header.get("src")
+    if src_root and os.path.exists(os.path.join(src_root, *src_rel.split("/"))): return True
+    size = state.sizes.get(src_rel)
+    try: return size is not None and os.path.getsize(dest) < size
+    except OSError: return False
+
+
+def discard_journal(out_base):
+    """Retires an interrupted run: deletes the partial copies its journal planned, then the journal.
+
+    Returns how many partial files were removed.
+    """
+    state = read_journal(journal_path(out_base))
+    if state is None: return 0
+    removed = 0
+    for src_rel, rel in state.pending.items():
+        dest = os.path.join(out_base, *rel.split("/"))
+        if not _is_partial(state, src_rel, dest): continue
+        try: os.remove(dest); removed += 1
+        except OSError: pass
+    try: os.remove(journal_path(out_base))
+    except OSError: pass
+    return removed
+
+
+def discard_interrupted(dest, mode, src=None):
+    """Before a new run into dest: retires the journal it would overwrite (grouped modes) or the
+    Classic-mode sessions find_resumable would keep offering, removing session folders left empty."""
+    if mode != "current": return discard_journal(dest)
+    removed = 0
+    for _, session in _resumable_sessions(dest, mode, src):
+        removed += discard_journal(session)
+        for dirpath, _, _ in os.walk(session, topdown=False):
+            try: os.rmdir(dirpath)
+            except OSError: pass
+    return removed
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class TransferJournal:
+    """Journal of one run; resume=True continues the journal in out_base if it belongs to src_root.
+
+    A journal written for another source is not resumed (refused is set) and
+    a new one replaces it.
+    """
+
+    def __init__(self, out_base, src_root, mode, move, resume=False):
+        self.out_base = out_base; self.src_root = src_root
+        self.path = journal_path(out_base)
+        self.state = (read_journal(self.path) if resume else None) or JournalState()
+        self.refused = resume and bool(self.state.header) and not matches_source(self.state.header, src_root)
+        if self.refused:
+            discard_journal(out_base); resume = False; self.state = JournalState()
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        self._f = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._f.tell() and not _ends_with_newline(self.path):
+            self._f.write("\n")      # cierra una línea truncada antes de seguir escribiendo
+        if not resume or not self.state.header:
+            volume, src_rel = source_key(src_root)
+            self._write({"op": "session", "src": os.path.abspath(src_root), "volume": volume, "src_rel": src_rel,
+                         "mode": mode, "move": bool(move)})
+
+    def _rel_src(self, path): return os.path.relpath(path, self.src_root).replace(os.sep, "/")
+    def _rel_dest(self, path): return os.path.relpath(path, self.out_base).replace(os.sep, "/")
+
+    def dest_for(self, rel_dest):
+        return os.path.join(self.out_base, *rel_dest.split("/"))
+
+    def _write(self, rec):
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._f is None: return
+            self._f.write(line); self._f.flush()
+            # flush basta ante un cierre de la app; fsync periódico cubre cortes de corriente
+            now = time.monotonic()
+            if now - self._last_sync >= FSYNC_INTERVAL:
+                os.fsync(self._f.fileno()); self._last_sync = now
+
+    def sync(self):
+        """Forces every record written so far to disk (before deleting moved sources)."""
+        with self._lock:
+            if self._f is None: return
+            self._f.flush(); os.fsync(self._f.fileno()); self._last_sync = time.monotonic()
+
+    def planned(self, src, dest_path, size=None):
+        self._write({"op": "plan", "src": self._rel_src(src), "dest": self._rel_dest(dest_path), "size": size})
+
+    def completed(self, src, dest_path):
+        self._write({"op": "done", "src": self._rel_src(src), "dest": self._rel_dest(dest_path)})
+
+    def lookup(self, src):
+        """("done" | "partial" | None, destination path) for a source file."""
+        rel = self._rel_src(src)
+        if rel in self.state.done: return "done", self.dest_for(self.state.done[rel])
+        if rel in self.state.pending: return "partial", self.dest_for(self.state.pending[rel])
+        return None, None
+
+    def close(self, finished=False):
+        """Closes the journal; a finished run removes it so it is no longer resumable."""
+        with self._lock:
+            if self._f is None: return
+            self._f.close(); self._f = None
+        if finished:
+            try: os.remove(self.path)
+            except OSError: pass
+
+
+def complete_partial(src, dst, chunk_size=8 * 1024 * 1024, on_bytes=None):
+    """Appends the missing tail of src to a partial copy dst; returns the offset it resumed at.
+
+    The last RESUME_OVERLAP bytes already in dst are compared with the source
+    first (a crash can leave unwritten blocks at the end); if they differ the
+    copy restarts from zero. Bytes already present are reported through
+    on_bytes up front so progress stays byte-accurate.
+    """
+    size = os.path.getsize(src)
+    have = os.path.getsize(dst) if os.path.exists(dst) else 0
+    offset = 0
+    if 0 < have <= size:
+        start = max(0, have - RESUME_OVERLAP)
+        with open(src, "rb") as fs, open(dst, "rb") as fd:
+            fs.seek(start); fd.seek(start)
+            if fs.read(have - start) == fd.read(have - start): offset = have
+    with open(src, "rb") as fsrc, open(dst, "r+b" if offset else "wb") as fdst:
+        fsrc.seek(offset); fdst.seek(offset); fdst.truncate()
+        if on_bytes and offset: on_bytes(offset)
+        buf = bytearray(chunk_size); view = memoryview(buf)
+        while True:
+            n = fsrc.readinto(buf)
+            if not n: break
+            fdst.write(view[:n])
+            if on_bytes: on_bytes(n)
+    shutil.copystat(src, dst)
+    return offset
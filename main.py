@@ -1,42 +1,69 @@
-import os, json, subprocess, datetime, re
+import time
+_STARTUP_T0 = time.perf_counter()
+import os, sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import tkinter.font as tkfont
 from styles import apply_styles
-# Add image support (Pillow) if available
-try:
-    from PIL import Image, ImageDraw, ImageTk
-except Exception:
-    Image = None
-    ImageDraw = None
-    ImageTk = None
-try:
-    import customtkinter as ctk
-    USE_CTK = True
-except Exception:
-    ctk = None
-    USE_CTK = False
+from ingest import APPDATA_DIR, Ingest, config, ensure_appdata, prepare_destination
+from ui_channel import UIChannel
+from activity_log import DEFAULT_BACKUPS, DEFAULT_CAPACITY, ActivityLog, RotatingLogFile, TextWindow
+from startup_profile import StartupProfile
+from journal import find_resumable
+# Pillow y customtkinter se importan al primer uso (load_pil / load_ctk): juntos
+# cuestan más que construir la ventana
+Image = None
+ImageDraw = None
+ImageTk = None
+PIL_LOADED = None
+ctk = None
+USE_CTK = None
+
+def load_pil():
+    """Imports Pillow once; returns False when it is not installed."""
+    global Image, ImageDraw, ImageTk, PIL_LOADED
+    if PIL_LOADED is None:
+        try:
+            from PIL import Image, ImageDraw, ImageTk
+            PIL_LOADED = True
+        except Exception:
+            PIL_LOADED = False
+    return PIL_LOADED
+
+def load_ctk():
+    """Imports customtkinter once; returns False to fall back to ttk."""
+    global ctk, USE_CTK
+    if USE_CTK is None:
+        try:
+            import customtkinter as ctk
+            USE_CTK = True
+        except Exception:
+            ctk = None
+            USE_CTK = False
+    return USE_CTK
+
+startup = StartupProfile(_STARTUP_T0, enabled="--profile-startup" in sys.argv)
+startup.mark("imports")
 
 icons = {}
 
 APP_NAME = "Archivium"
-APP_ID = "Archivium"
-APPDATA_DIR = os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), APP_ID)
-CONFIG_PATH = os.path.join(APPDATA_DIR, "config.json")
-DEFAULT_CONFIG = {"default_dest": "", "theme": "system", "organize_mode": "current"}
+ACTIVITY_LOG_PATH = os.path.join(APPDATA_DIR, "archivium.log")
+FONT_CACHE_PATH = os.path.join(APPDATA_DIR, "font_cache.json")
+ICON_CACHE_DIR = os.path.join(APPDATA_DIR, "icons")
+ICON_CACHE_VERSION = 1
+STARTUP_PROFILE_PATH = os.path.join(APPDATA_DIR, "startup_profile.json")
 # App logo paths
 LOGO_PATH = os.path.join(os.path.dirname(__file__), "img", "logo.PNG")
 LOGO_ICO_PATH = os.path.join(os.path.dirname(__file__), "img", "logo.ico")
 HEADER_IMAGE_SIZE = 48
 
-JPEG_PATTERNS = ["*.jpg","*.jpeg","*.jpe","*.jfif","*.png","*.gif","*.bmp","*.tiff","*.tif","*.webp","*.ico","*.svg","*.heic","*.heif"]
-RAW_PATTERNS  = ["*.cr2","*.cr3","*.nef","*.raf","*.arw","*.rw2","*.dng","*.orf","*.sr2","*.pef","*.nrw"]
-VIDEO_PATTERNS= ["*.mp4","*.mov","*.avi","*.mts","*.mxf","*.mpg","*.mpeg","*.mkv","*.wmv","*.3gp"]
-
 log_text = None
+log_window = None
 format_btn = None
 organize_btn = None
 root_app = None
+ui = None
 logs_frame = None
 logs_toggle_btn = None
 logs_visible = False
@@ -55,37 +82,33 @@ LABEL_FONT_BOLD = None
 EMOJI_FONT = None
 ENTRY_FONT = None
 
-def ensure_appdata(): os.makedirs(APPDATA_DIR, exist_ok=True)
-
-def load_config():
-    ensure_appdata()
-    if os.path.exists(CONFIG_PATH):
-        try:
-            with open(CONFIG_PATH,"r",encoding="utf-8") as f: return json.load(f)
-        except Exception: pass
-    return DEFAULT_CONFIG.copy()
+def make_log_window(widget):
+    cfg = config.snapshot()
+    log_file = None
+    try:
+        ensure_appdata()
+        log_file = RotatingLogFile(ACTIVITY_LOG_PATH, int(cfg.get("log_file_max_mb", 5) * 1024 * 1024),
+                                   cfg.get("log_file_backups", DEFAULT_BACKUPS))
+    except Exception: pass
+    return TextWindow(widget, ActivityLog(cfg.get("log_capacity", DEFAULT_CAPACITY), log_file))
 
-def save_config(cfg):
-    ensure_appdata()
-    with open(CONFIG_PATH,"w",encoding="utf-8") as f: json.dump(cfg,f,ensure_ascii=False,indent=2)
+def append_log_lines(lines):
+    log_window.append(lines)
 
+# Desde cualquier hilo: las líneas se agrupan y se pintan una vez por frame
 def log(text):
-    import threading
-    def _append():
-        log_text.configure(state="normal")
-        log_text.insert("end", text+"\n")
-        log_text.see("end")
-        log_text.configure(state="disabled")
-    if threading.current_thread() is threading.main_thread():
-        _append()
-    else:
-        root_app.after(0, _append)
+    if ui: ui.log(text)
+    else: append_log_lines([text])
+
+def set_status(text):
+    if ui: ui.post(status_var.set, text, key="status")
+    else: status_var.set(text)
 
 def pick_dest():
     path = filedialog.askdirectory(title="Select destination folder")
     if path:
         dest_var.set(path)
-        cfg = load_config(); cfg["default_dest"] = path; save_config(cfg)
+        config.set("default_dest", path)
         log(f"Destination saved: {path}")
 
 def pick_src():
@@ -94,30 +117,12 @@ def pick_src():
         src_var.set(path)
         log(f"Source: {path}")
 
-def today_str(): return datetime.date.today().strftime("%Y-%m-%d")
-
-def next_sequence_folder(base):
-    date_str = today_str(); prefix = date_str+"_"; seq = 1
-    try:
-        existing = [d for d in os.listdir(base) if os.path.isdir(os.path.join(base,d)) and d.startswith(prefix)]
-        if existing:
-            nums = []; pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$")
-            for d in existing:
-                m = pattern.match(d)
-                if m: nums.append(int(m.group(1)))
-            if nums: seq = max(nums) + 1
-    except Exception: pass
-    return os.path.join(base, f"{prefix}{seq:02d}")
-
-def ensure_dirs(*dirs):
-    for d in dirs: os.makedirs(d, exist_ok=True)
-
 def detect_drive_letter(path):
     if os.name == 'nt' and len(path) >= 2 and path[1] == ':': return path[0].upper()
     return None
 
 def ensure_logo_icon():
-    if not os.path.exists(LOGO_ICO_PATH) and Image:
+    if not os.path.exists(LOGO_ICO_PATH) and load_pil():
         try:
             if os.path.exists(LOGO_PATH):
                 img = Image.open(LOGO_PATH).convert("RGBA")
@@ -134,199 +139,58 @@ def clear_window_icon(root):
     try: root.iconbitmap("")
     except Exception: pass
 
-def robocopy_available():
-    try: subprocess.run(["robocopy", "/?"], capture_output=True, check=False); return True
-    except Exception: return False
-
-def transfer_with_robocopy(src, dest, patterns, move=False):
-    import fnmatch as _fnmatch
-    os.makedirs(dest, exist_ok=True)
-    overall_success = True
-    for dirpath, dirs, filenames in os.walk(src):
-        if not any(_fnmatch.fnmatch(f.lower(), p.lower()) for f in filenames for p in patterns):
-            continue
-        cmd = ["robocopy", dirpath, dest] + patterns
-        if move: cmd.append("/MOVE")
-        cmd.extend(["/R:3", "/W:1", "/NP", "/NDL", "/NFL"])
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result.returncode >= 8: overall_success = False
-        except Exception: overall_success = False
-    return overall_success
-
-def unique_dest_path(dest, filename):
-    base, ext = os.path.splitext(filename); counter = 1
-    while os.path.exists(os.path.join(dest, filename)):
-        filename = f"{base}_{counter}{ext}"; counter += 1
-    return os.path.join(dest, filename)
-
-# Determina el tipo de archivo a partir de su extensión
-def get_file_type(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    jpeg_exts = {".jpg",".jpeg",".jpe",".jfif",".png",".gif",".bmp",".tiff",".tif",".webp",".ico",".svg",".heic",".heif"}
-    raw_exts = {".cr2",".cr3",".nef",".raf",".arw",".rw2",".dng",".orf",".sr2",".pef",".nrw"}
-    video_exts = {".mp4",".mov",".avi",".mts",".mxf",".mpg",".mpeg",".mkv",".wmv",".3gp"}
-    if ext in jpeg_exts: return "JPEG"
-    if ext in raw_exts: return "RAW"
-    if ext in video_exts: return "VIDEO"
-    return None
-
-# Obtiene la fecha de captura (EXIF si disponible; si no, fecha de modificación)
-def get_capture_date(file_path):
-    # Devuelve formato DD-MM-YYYY
-    try:
-        if Image:
-            try:
-                img = Image.open(file_path)
-                exif = {}
-                try:
-                    exif = img.getexif() or {}
-                except Exception:
-                    pass
-                # Intentar claves string y numéricas más comunes
-                dt = None
-                if isinstance(exif, dict):
-                    dt = exif.get("DateTimeOriginal") or exif.get("DateTime") or exif.get("DateTimeDigitized")
-                    dt = dt or exif.get(36867) or exif.get(306) or exif.get(36868)
-                if dt:
-                    # Formato típico: YYYY:MM:DD HH:MM:SS
-                    import datetime as _dt
-                    s = str(dt)
-                    parts = s.split(" ")[0].replace(":","-").split("-")
-                    if len(parts) >= 3:
-                        yyyy, mm, dd = parts[0], parts[1], parts[2]
-                        return f"{dd}-{mm}-{yyyy}"
-                try:
-                    img.close()
-                except Exception:
-                    pass
-            except Exception:
-                pass
-        ts = os.path.getmtime(file_path)
-        d = datetime.datetime.fromtimestamp(ts).date()
-        return d.strftime("%d-%m-%Y")
-    except Exception:
-        return datetime.date.today().strftime("%d-%m-%Y")
-
-# Transfiere agrupando por fecha→tipo o tipo→fecha
-def transfer_grouped(src, dest, move=False, progress_cb=None, mode="date_then_type"):
-    import shutil, threading
-    global cancel_event
-    files_info = []
-    for root, dirs, filenames in os.walk(src):
-        if cancel_event and cancel_event.is_set(): return False
-        for filename in filenames:
-            fp = os.path.join(root, filename)
-            typ = get_file_type(fp)
-            if not typ: continue
-            date_str = get_capture_date(fp)
-            files_info.append((fp, typ, date_str))
-    total = len(files_info); transferred = 0
-    for fp, typ, date_str in files_info:
-        if cancel_event and cancel_event.is_set(): return False
-        try:
-            if mode == "date_then_type":
-                dest_dir = os.path.join(dest, date_str, typ)
-            else:
-                dest_dir = os.path.join(dest, typ, date_str)
-            os.makedirs(dest_dir, exist_ok=True)
-            out_name = os.path.basename(fp)
-            dest_path = os.path.join(dest_dir, out_name)
-            if os.path.exists(dest_path): dest_path = unique_dest_path(dest_dir, out_name)
-            if move: shutil.move(fp, dest_path)
-            else: shutil.copy2(fp, dest_path)
-            transferred += 1
-            if progress_cb and threading.current_thread() is threading.main_thread():
-                progress_cb(transferred, total, typ)
-            elif progress_cb:
-                root_app.after(0, lambda t=transferred, tot=total, k=typ: progress_cb(t, tot, k))
-        except Exception as e:
-            log(f"Error transferring {fp}: {e}")
-    return True
-
-def transfer_with_python(src, dest, patterns, move=False, progress_cb=None, kind=None):
-    import shutil, fnmatch, threading
-    global cancel_event
-    if cancel_event and cancel_event.is_set(): return False
-    files = []
-    for root, dirs, filenames in os.walk(src):
-        if cancel_event and cancel_event.is_set(): return False
-        for filename in filenames:
-            for pattern in patterns:
-                if fnmatch.fnmatch(filename.lower(), pattern.lower()):
-                    files.append(os.path.join(root, filename)); break
-    if not files: return True
-    total = len(files); transferred = 0
-    for file_path in files:
-        if cancel_event and cancel_event.is_set(): return False
-        try:
-            out_name = os.path.basename(file_path)
-            dest_path = os.path.join(dest, out_name)
-            os.makedirs(dest, exist_ok=True)
-            if os.path.exists(dest_path): dest_path = unique_dest_path(dest, out_name)
-            if move: shutil.move(file_path, dest_path)
-            else: shutil.copy2(file_path, dest_path)
-            transferred += 1
-            if progress_cb and threading.current_thread() is threading.main_thread():
-                progress_cb(transferred, total, kind)
-            elif progress_cb:
-                root_app.after(0, lambda t=transferred, tot=total, k=kind: progress_cb(t, tot, k))
-        except Exception as e:
-            log(f"Error transferring {file_path}: {e}")
-    return True
-
-def do_transfer(src, session_dir, move=False):
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB": return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def format_eta(seconds):
+    if seconds is None: return "--:--"
+    m, sec = divmod(int(seconds), 60); h, m = divmod(m, 60)
+    return f"{h}:{m:02d}:{sec:02d}" if h else f"{m:02d}:{sec:02d}"
+
+# Línea de estado basada en bytes: total, velocidad suavizada y ETA (global y de la categoría)
+def format_progress(p):
+    total = format_bytes(p.bytes_total) + ("+" if p.scanning else "")
+    line = (f"Transferring {p.kind}: {format_bytes(p.bytes_done)}/{total} ({p.fraction * 100:.1f}%)"
+            f" · {p.files_done}/{p.files_total} files · {format_bytes(p.rate)}/s · ETA {format_eta(p.eta)}")
+    if p.kind_bytes_total and p.kind_bytes_total != p.bytes_total:
+        line += f" ({p.kind} {format_eta(p.kind_eta)})"
+    return line
+
+def do_transfer(src, session_dir, move=False, cfg=None, resume=False):
     global cancel_event, is_transferring, transfer_thread
     import threading
     cancel_event = threading.Event(); is_transferring = True
+    # La transferencia usa la configuración del momento de inicio aunque cambie durante la copia
+    if cfg is None: cfg = config.snapshot()
     show_progress()
-    def progress_callback(transferred, total, kind):
-        if total > 0:
-            pct = (transferred / total) * 100
-            progress_bar.set(pct / 100)
-            status_var.set(f"Transferring {kind}: {transferred}/{total} ({pct:.1f}%)")
+    def progress_callback(p):
+        if p.bytes_total > 0:
+            progress_bar.set(p.fraction)
+            status_var.set(format_progress(p))
+    # Solo el último estado de progreso de cada frame llega a la UI
+    def on_progress(snapshot):
+        if ui: ui.post(progress_callback, snapshot, key="progress")
+        else: progress_callback(snapshot)
     def transfer_task():
         try:
-            log(f"Starting transfer from {src} to {session_dir}")
-            log(f"Mode: {'Move' if move else 'Copy'}")
-            cfg = load_config(); mode = cfg.get("organize_mode", "current")
-            if mode == "current":
-                jpeg_dir = os.path.join(session_dir, "JPEG")
-                raw_dir = os.path.join(session_dir, "RAW")
-                video_dir = os.path.join(session_dir, "VIDEO")
-                ensure_dirs(jpeg_dir, raw_dir, video_dir)
-                # Transfer by categories
-                categories = [("JPEG", JPEG_PATTERNS, jpeg_dir), ("RAW", RAW_PATTERNS, raw_dir), ("VIDEO", VIDEO_PATTERNS, video_dir)]
-                for kind, patterns, dest_dir in categories:
-                    if cancel_event.is_set(): break
-                    log(f"Transferring {kind} files...")
-                    status_var.set(f"Transferring {kind} files...")
-                    if robocopy_available() and os.name == 'nt':
-                        success = transfer_with_robocopy(src, dest_dir, patterns, move)
-                    else:
-                        success = transfer_with_python(src, dest_dir, patterns, move, progress_callback, kind)
-                    if not success and not cancel_event.is_set():
-                        log(f"Failed to transfer {kind} files")
-            else:
-                log(f"Transfiriendo en modo '{mode}'...")
-                status_var.set("Transferring grouped files...")
-                # Para modos avanzados se usa transferencia Python agrupada
-                m = "date_then_type" if mode == "date_then_type" else "type_then_date"
-                success = transfer_grouped(src, session_dir, move, progress_callback, mode=m)
-                if not success and not cancel_event.is_set():
-                    log("Failed to transfer grouped files")
+            mode = cfg.get("organize_mode", "current")
+            set_status("Transferring files..." if mode == "current" else "Transferring grouped files...")
+            Ingest(cfg, cancel_event, log_cb=log, progress_cb=on_progress).run(src, session_dir, mode, move, resume)
             if cancel_event.is_set():
                 log("Transfer cancelled by user")
-                status_var.set("Transfer cancelled")
+                set_status("Transfer cancelled")
             else:
                 log("Transfer completed successfully")
-                status_var.set("Transfer completed")
+                set_status("Transfer completed")
         except Exception as e:
             log(f"Transfer error: {e}")
-            status_var.set(f"Transfer error: {e}")
+            set_status(f"Transfer error: {e}")
         finally:
             is_transferring = False
-            hide_progress()
+            if ui: ui.post(hide_progress)
+            else: hide_progress()
     transfer_thread = threading.Thread(target=transfer_task, daemon=True)
     transfer_thread.start()
 
@@ -341,9 +205,12 @@ def organize():
     except Exception:
         pass
     if is_transferring:
+        if cancel_event and cancel_event.is_set(): return      # ya se está cancelando
         if messagebox.askyesno("Cancel Transfer", "A transfer is in progress. Cancel it?"):
+            # Sin join: los hilos de copia paran en su siguiente bloque y transfer_task
+            # restablece el estado y oculta el progreso desde su finally
             if cancel_event: cancel_event.set()
-            if transfer_thread: transfer_thread.join(timeout=2)
+            set_status("Cancelling transfer...")
         return
     src = src_var.get().strip(); dest = dest_var.get().strip()
     if not src:
@@ -354,17 +221,20 @@ def organize():
         messagebox.showerror("Error", f"Source folder does not exist: {src}"); return
     if not os.path.exists(dest):
         messagebox.showerror("Error", f"Destination folder does not exist: {dest}"); return
-    cfg = load_config(); mode = cfg.get("organize_mode", "current")
-    if mode == "current":
-        session_dir = next_sequence_folder(dest)
-        try: os.makedirs(session_dir, exist_ok=True)
-        except Exception as e:
-            messagebox.showerror("Error", f"Cannot create session folder: {e}"); return
-        out_base = session_dir
-    else:
-        out_base = dest
+    cfg = config.snapshot(); mode = cfg.get("organize_mode", "current")
+    # Una transferencia interrumpida (cancelada o por un cierre) se puede continuar
+    resume = False
+    pending = find_resumable(dest, mode, src)
+    if pending:
+        answer = messagebox.askyesnocancel("Resume Transfer", f"An interrupted transfer into {pending} can be resumed.\n\n"
+                                           "Yes: resume it and skip the files already transferred\nNo: start a new transfer")
+        if answer is None: return
+        resume = answer
+    try: out_base = prepare_destination(dest, mode, resume, src)
+    except Exception as e:
+        messagebox.showerror("Error", f"Cannot create session folder: {e}"); return
     move_files = move_var.get()
-    do_transfer(src, out_base, move_files)
+    do_transfer(src, out_base, move_files, cfg, resume)
 
 def format_sd():
     src = src_var.get().strip()
@@ -375,6 +245,7 @@ def format_sd():
         messagebox.showerror("Error", "Cannot detect drive letter. Please select the root of an SD card."); return
     if not messagebox.askyesno("Confirm Format", f"This will FORMAT drive {drive}: and erase ALL data. Continue?"):
         return
+    import subprocess
     try:
         cmd = f'format {drive}: /FS:exFAT /Q /V:SD_CARD /Y'
         result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
@@ -389,7 +260,7 @@ def format_sd():
         messagebox.showerror("Error", f"Format error: {e}")
 
 def _make_folder_pil(size=24, color="#e5e7eb"):
-    if not Image: return None
+    if not load_pil(): return None
     img = Image.new("RGBA", (size, size), (0,0,0,0))
     draw = ImageDraw.Draw(img)
     margin = size // 8; folder_height = size - 2*margin; folder_width = size - 2*margin
@@ -398,15 +269,31 @@ def _make_folder_pil(size=24, color="#e5e7eb"):
     draw.rectangle([margin, margin, margin + tab_width, margin + tab_height], fill=color)
     return img
 
-def make_ctk_folder_icon(size=20, color="#e5e7eb"):
-    if not ctk or not ImageTk: return None
+def folder_icon_path(size=24, color="#e5e7eb"):
+    """PNG of the folder icon, drawn with Pillow once and then reused from the app data folder."""
+    path = os.path.join(ICON_CACHE_DIR, f"folder_v{ICON_CACHE_VERSION}_{size}_{color.lstrip('#')}.png")
+    if os.path.exists(path): return path
     pil_img = _make_folder_pil(size, color)
-    return ctk.CTkImage(light_image=pil_img, dark_image=pil_img, size=(size, size)) if pil_img else None
+    if pil_img is None: return None
+    try:
+        os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+        pil_img.save(path + ".tmp", format="PNG"); os.replace(path + ".tmp", path)
+        return path
+    except OSError:
+        return None
+
+def make_ctk_folder_icon(size=20, color="#e5e7eb"):
+    # CTkImage necesita imágenes PIL; customtkinter ya importa Pillow, así que no añade coste
+    path = folder_icon_path(size, color)
+    if not path or not load_ctk() or not load_pil(): return None
+    pil_img = Image.open(path)
+    return ctk.CTkImage(light_image=pil_img, dark_image=pil_img, size=(size, size))
 
 def make_tk_folder_icon(root, size=16, color="#e5e7eb"):
-    if not ImageTk: return None
-    pil_img = _make_folder_pil(size, color)
-    return ImageTk.PhotoImage(pil_img) if pil_img else None
+    # Tk 8.6 lee PNG directamente: con el icono en caché no hace falta Pillow
+    path = folder_icon_path(size, color)
+    try: return tk.PhotoImage(master=root, file=path) if path else None
+    except tk.TclError: return None
 
 def pick_font_family(root):
     global UI_FONT_FAMILY
@@ -473,7 +360,7 @@ def apply_theme(theme_name):
         else:
             ctk.set_appearance_mode(theme_name)
     
-    cfg = load_config(); cfg["theme"] = theme_name; save_config(cfg)
+    config.set("theme", theme_name)
     log(f"Theme changed to: {theme_name}")
     
     # Immediate re-elevation if exists
@@ -528,11 +415,18 @@ def apply_theme(theme_name):
 # Guarda el modo de organización de carpetas seleccionado
 def apply_organize_mode(mode_name):
     try:
-        cfg = load_config(); cfg["organize_mode"] = mode_name; save_config(cfg)
+        config.set("organize_mode", mode_name)
         log(f"Modo de organización actualizado: {mode_name}")
     except Exception as e:
         log(f"No se pudo guardar el modo de organización: {e}")
 
+def apply_skip_imported(enabled):
+    try:
+        config.set("skip_imported", bool(enabled))
+        log(f"Importar solo archivos nuevos: {'sí' if enabled else 'no'}")
+    except Exception as e:
+        log(f"No se pudo guardar la preferencia de importación: {e}")
+
 def open_settings():
     """Opens the settings window as a child of main, with sidenav and icon"""
     global CURRENT_SETTINGS_WINDOW, USER_INTENDS_SETTINGS
@@ -561,10 +455,10 @@ def open_settings():
             pass
         
         # Get fonts from styles object
-        styles_obj = apply_styles(settings_window, use_ctk=True)
+        styles_obj = apply_styles(settings_window, use_ctk=True, font_cache=FONT_CACHE_PATH)
         
         # Center over main
-        width, height = 600, 450
+        width, height = 600, 540
         try:
             root_app.update_idletasks()
             rx, ry = root_app.winfo_rootx(), root_app.winfo_rooty()
@@ -633,7 +527,7 @@ def open_settings():
         theme_section.grid_columnconfigure(0, weight=1)
         ctk.CTkLabel(theme_section, text="Theme", font=styles_obj.HEADLINE_FONT).grid(row=0, column=0, sticky="w", pady=(0,4))
         ctk.CTkLabel(theme_section, text="Choose between light, dark, or system theme", font=styles_obj.SUBHEADLINE_FONT, text_color="#9ca3af").grid(row=1, column=0, sticky="w", pady=(0,12))
-        current_config = load_config(); current_theme = current_config.get("theme", "system")
+        current_theme = config.get("theme", "system")
         theme_var = tk.StringVar(value=current_theme)
         theme_options = ctk.CTkSegmentedButton(theme_section, values=["light","dark","system"], variable=theme_var, command=lambda m: apply_theme(m), font=styles_obj.CALLOUT_FONT)
         theme_options.grid(row=2, column=0, sticky="w")
@@ -647,7 +541,7 @@ def open_settings():
         behavior_header.grid(row=0, column=0, sticky="ew", pady=(0,20))
         ctk.CTkLabel(behavior_header, text="Behavior", font=styles_obj.TITLE_2_FONT).grid(row=0, column=0, sticky="w")
         ctk.CTkLabel(behavior_header, text="Configure how destination folders are organized", font=styles_obj.SUBHEADLINE_FONT, text_color="#9ca3af").grid(row=1, column=0, sticky="w", pady=(4,0))
-        current_cfg2 = load_config(); current_mode = current_cfg2.get("organize_mode", "current")
+        current_mode = config.get("organize_mode", "current")
         mode_var = tk.StringVar(value=current_mode)
         
         # Group title
@@ -661,6 +555,11 @@ def open_settings():
         ctk.CTkRadioButton(radio_frame, text="Collections (Type First)", variable=mode_var, value="type_then_date", command=lambda: apply_organize_mode(mode_var.get()), font=styles_obj.CALLOUT_FONT).grid(row=4, column=0, sticky="w")
         ctk.CTkLabel(radio_frame, text="Groups by file type, then by capture date (e.g., Images/2025/10/22).", font=styles_obj.FOOTNOTE_FONT, text_color="#9ca3af").grid(row=5, column=0, sticky="w")
 
+        ctk.CTkLabel(behavior_section, text="Imports", font=styles_obj.HEADLINE_FONT).grid(row=3, column=0, sticky="w", pady=(16,8))
+        skip_var = tk.BooleanVar(value=config.get("skip_imported", True))
+        ctk.CTkSwitch(behavior_section, text="Only import new files", variable=skip_var, onvalue=True, offvalue=False, command=lambda: apply_skip_imported(skip_var.get()), font=styles_obj.CALLOUT_FONT).grid(row=4, column=0, sticky="w")
+        ctk.CTkLabel(behavior_section, text="Skips files already imported from the same card into the same destination. Turn off to import everything again.", font=styles_obj.FOOTNOTE_FONT, text_color="#9ca3af", wraplength=360, justify="left").grid(row=5, column=0, sticky="w", pady=(4,0))
+
         # Initially show Appearance
         behavior_section.grid_remove()
         update_section_view()
@@ -695,7 +594,7 @@ def open_settings():
                 settings_window.wm_iconbitmap(LOGO_ICO_PATH)
         except Exception:
             pass
-        width, height = 600, 420
+        width, height = 600, 500
         try:
             root_app.update_idletasks()
             rx, ry = root_app.winfo_rootx(), root_app.winfo_rooty()
@@ -728,7 +627,7 @@ def open_settings():
         
         appearance = ttk.LabelFrame(right, text="Appearance", padding=12)
         ttk.Label(appearance, text="Theme:").pack(anchor="w", pady=(0,5))
-        current_config = load_config(); current_theme = current_config.get("theme", "system")
+        current_theme = config.get("theme", "system")
         theme_var = tk.StringVar(value=current_theme)
         def on_theme_change(): apply_theme(theme_var.get())
         radios = ttk.Frame(appearance); radios.pack(anchor="w", pady=(0,10))
@@ -747,6 +646,9 @@ def open_settings():
         ttk.Label(behavior, text="Groups by capture date, then by file type (e.g., 2025/10/22/Images).", foreground="#6b7280").pack(anchor="w", padx=(24,0), pady=(0,8))
         ttk.Radiobutton(behavior, text="Collections (Type First)", variable=mode_var, value="type_then_date", command=on_mode_change).pack(anchor="w")
         ttk.Label(behavior, text="Groups by file type, then by capture date (e.g., Images/2025/10/22).", foreground="#6b7280").pack(anchor="w", padx=(24,0))
+        skip_var = tk.BooleanVar(value=config.get("skip_imported", True))
+        ttk.Checkbutton(behavior, text="Only import new files", variable=skip_var, command=lambda: apply_skip_imported(skip_var.get())).pack(anchor="w", pady=(12,0))
+        ttk.Label(behavior, text="Skips files already imported from the same card into the same destination.", foreground="#6b7280").pack(anchor="w", padx=(24,0))
 
         def close_settings():
             try: settings_window.destroy()
@@ -758,16 +660,18 @@ def open_settings():
         ttk.Button(right, text="Close", command=close_settings).pack(anchor="e", pady=(12,0))
 
 def build_gui():
-    global dest_var, src_var, move_var, status_var, root_app, organize_btn, format_btn, log_text, logs_frame, logs_toggle_btn, logs_visible, progress_bar
-    if 'USE_CTK' in globals() and USE_CTK:
+    global dest_var, src_var, move_var, status_var, root_app, ui, organize_btn, format_btn, log_text, log_window, logs_frame, logs_toggle_btn, logs_visible, progress_bar
+    use_ctk = load_ctk()
+    startup.mark("import customtkinter" if use_ctk else "import ttk fallback")
+    if use_ctk:
         root = ctk.CTk(); root.title("")
         set_window_icon(root)
-        styles_obj = apply_styles(root, use_ctk=True)
+        startup.mark("create root window")
+        styles_obj = apply_styles(root, use_ctk=True, font_cache=FONT_CACHE_PATH)
+        startup.mark("styles and fonts")
         
-        # New Apple-style typographic hierarchy
-        LARGE_TITLE_FONT = styles_obj.LARGE_TITLE_FONT
+        # Fonts used by the main window (the rest are created lazily by Settings)
         TITLE_1_FONT = styles_obj.TITLE_1_FONT
-        TITLE_2_FONT = styles_obj.TITLE_2_FONT
         TITLE_3_FONT = styles_obj.TITLE_3_FONT
         HEADLINE_FONT = styles_obj.HEADLINE_FONT
         BODY_FONT = styles_obj.BODY_FONT
@@ -778,14 +682,8 @@ def build_gui():
         MONOSPACE_FONT = styles_obj.MONOSPACE_FONT
         EMOJI_FONT = styles_obj.EMOJI_FONT
         
-        # Compatibility with existing code
-        TITLE_FONT = styles_obj.TITLE_FONT
-        SMALL_FONT = styles_obj.SMALL_FONT
-        LABEL_FONT_BOLD = styles_obj.LABEL_FONT_BOLD
-        BASE_FONT = styles_obj.BASE_FONT
-        ENTRY_FONT = styles_obj.ENTRY_FONT
-        
         root_app = root
+        ui = UIChannel(root, append_log_lines); ui.start()
         dest_var = tk.StringVar(root)
         src_var = tk.StringVar(root)
         move_var = tk.BooleanVar(root, value=False)
@@ -888,25 +786,30 @@ def build_gui():
         ctk.CTkLabel(log_header, text="Real-time transfer progress and details", font=CAPTION_1_FONT, text_color="#9ca3af").grid(row=1, column=0, sticky="w", pady=(2,0))
         
         log_text = ctk.CTkTextbox(logs_frame, width=560, height=180, font=MONOSPACE_FONT)
+        log_window = make_log_window(log_text)
         log_text.grid(row=1, column=0, sticky="nsew", padx=8, pady=(0,8))
         logs_frame.grid_columnconfigure(0, weight=1); logs_frame.grid_rowconfigure(1, weight=1)
         # Collapse by default
         logs_visible = False
         logs_frame.grid_remove()
         main_frame.grid_rowconfigure(3, weight=1)
+        startup.mark("build widgets")
         
         # Apply saved theme
-        cfg = load_config()
-        saved_theme = cfg.get("theme", "system")
+        saved_theme = config.get("theme", "system")
         apply_theme(saved_theme)
         
-        if cfg.get("default_dest"): dest_var.set(cfg["default_dest"]) 
+        if config.get("default_dest"): dest_var.set(config.get("default_dest"))
+        startup.mark("config and theme")
         return root
     else:
         root = tk.Tk(); root.title("")
         clear_window_icon(root)
-        styles_obj = apply_styles(root, use_ctk=False)
+        startup.mark("create root window")
+        styles_obj = apply_styles(root, use_ctk=False, font_cache=FONT_CACHE_PATH)
+        startup.mark("styles and fonts")
         root_app = root
+        ui = UIChannel(root, append_log_lines); ui.start()
         dest_var = tk.StringVar(root)
         src_var = tk.StringVar(root)
         move_var = tk.BooleanVar(root, value=False)
@@ -959,6 +862,7 @@ def build_gui():
         logs_frame.grid(row=8,column=0,columnspan=3,sticky="nsew",pady=(6,0))
         ttk.Label(logs_frame,text="Log:", style='FieldLabel.TLabel').grid(row=0,column=0,sticky="nw")
         log_text = tk.Text(logs_frame,height=10,width=80,state="disabled",bg="#0f172a",fg="#e5e7eb",relief="flat",highlightthickness=1,highlightbackground="#334155")
+        log_window = make_log_window(log_text)
         log_text.grid(row=1,column=0,sticky="nsew")
         scroll = ttk.Scrollbar(logs_frame,orient="vertical",command=log_text.yview); log_text.configure(yscrollcommand=scroll.set)
         scroll.grid(row=1,column=1,sticky="ns")
@@ -966,10 +870,22 @@ def build_gui():
         logs_visible = False
         logs_frame.grid_remove()
         frm.columnconfigure(0, weight=1); frm.rowconfigure(8, weight=1)
-        cfg = load_config();
-        if cfg.get("default_dest"): dest_var.set(cfg["default_dest"]) 
+        startup.mark("build widgets")
+        if config.get("default_dest"): dest_var.set(config.get("default_dest"))
+        startup.mark("config and theme")
         return root
 
+def profile_first_paint(root):
+    """With --profile-startup, reports the startup breakdown once the window is first drawn."""
+    if not startup.enabled: return
+    def on_expose(event):
+        if event.widget is not root or startup.done: return
+        startup.mark("first paint")
+        ensure_appdata()
+        for line in startup.report(json_path=STARTUP_PROFILE_PATH): log(line)
+    root.bind("<Expose>", on_expose, add="+")
+
 if __name__ == "__main__":
     app = build_gui()
+    profile_first_paint(app)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,391 @@
+"""Capture-date extraction that only reads file headers.
+
+JPEG APP1 segments and TIFF-based RAW IFDs (CR2, NEF, ARW, DNG, ORF, RW2,
+PEF, ...) are parsed with a handful of small bounded reads, so a 50 MB RAW
+costs the same as a thumbnail. Videos are handled at container level: ISO
+BMFF/QuickTime boxes are walked by seeking from header to header straight to
+moov/mvhd and \xa9day, and AVCHD/MTS streams are searched for the MDPM
+recording-date pack near the start of the file. PIL is only tried as a last
+resort for image formats without a dedicated reader.
+
+Results can be memoised across runs in a MetadataCache (SQLite), keyed by
+absolute path, size and mtime_ns, so re-scanning a card never reopens files.
+"""
+import datetime, os, sqlite3, struct, threading
+
+HEAD_SIZE = 64 * 1024          # first read; covers the EXIF block of almost every camera file
+MAX_READ = 64 * 1024           # upper bound for any single read outside the head
+MAX_IFD_ENTRIES = 512
+MAX_JPEG_SEGMENTS = 64
+MAX_BOXES = 1024
+MTS_SCAN_SIZE = 512 * 1024     # the first GOP (and its MDPM pack) sits well inside this
+
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+# TIFF magic numbers: standard, Olympus ORF ("RO"/"SR") and Panasonic RW2
+TIFF_MAGICS = {42, 0x4F52, 0x5352, 0x55}
+
+BMFF_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot", b"uuid"}
+# Still-image formats built on BMFF whose mvhd is not a capture time
+BMFF_SKIP_BRANDS = {b"crx ", b"heic", b"heix", b"mif1", b"msf1", b"avif"}
+# AVCHD: SEI user_data_unregistered UUID that precedes the MDPM pack
+MDPM_MARKER = bytes.fromhex("17ee8c60f84d11d98cd60800200c9a66") + b"MDPM"
+MIN_VIDEO_YEAR = 1995
+
+DEFAULT_CACHE_ENTRIES = 250_000
+WRITE_BATCH = 2000
+
+# Formats PIL may still extract EXIF from when the header reader does not apply
+PIL_FALLBACK_EXTS = {".png", ".gif", ".bmp", ".webp", ".heic", ".heif"}
+
+
+class _Reader:
+    """Bounded random access over a file, relative to base, with a cached head."""
+
+    def __init__(self, f, base=0, head=None):
+        self.f = f; self.base = base
+        if head is None:
+            f.seek(base); head = f.read(HEAD_SIZE)
+        self.head = head
+
+    def read(self, offset, size):
+        size = min(size, MAX_READ)
+        if offset < 0: return b""
+        if offset + size <= len(self.head): return self.head[offset:offset + size]
+        self.f.seek(self.base + offset)
+        return self.f.read(size)
+
+    def sub(self, offset):
+        head = self.head[offset:] if offset < len(self.head) else None
+        return _Reader(self.f, self.base + offset, head or None)
+
+
+def parse_exif_datetime(value):
+    """'YYYY:MM:DD HH:MM:SS' (EXIF) to datetime; None for empty/zeroed values."""
+    if isinstance(value, bytes): value = value.decode("ascii", "ignore")
+    s = str(value).strip("\x00 ").replace("-", ":")
+    for fmt, n in (("%Y:%m:%d %H:%M:%S", 19), ("%Y:%m:%d", 10)):
+        try: return datetime.datetime.strptime(s[:n], fmt)
+        except ValueError: continue
+    return None
+
+
+def _read_ifd(r, e, offset, wanted):
+    raw = r.read(offset, 2)
+    if len(raw) < 2: return {}
+    count = min(struct.unpack(e + "H", raw)[0], MAX_IFD_ENTRIES)
+    data = r.read(offset + 2, count * 12)
+    out = {}
+    for i in range(len(data) // 12):
+        tag, typ, n = struct.unpack(e + "HHI", data[i * 12:i * 12 + 8])
+        if tag not in wanted: continue
+        value = data[i * 12 + 8:i * 12 + 12]
+        if typ == 2:   # ASCII
+            out[tag] = value[:n] if n <= 4 else r.read(struct.unpack(e + "I", value)[0], min(n, 64))
+        elif typ in (4, 13):   # LONG / IFD pointer
+            out[tag] = struct.unpack(e + "I", value)[0]
+    return out
+
+
+def tiff_datetime(r):
+    """DateTimeOriginal, DateTime or DateTimeDigitized from a TIFF structure at r."""
+    hdr = r.read(0, 8)
+    if len(hdr) < 8: return None
+    if hdr[:2] == b"II": e = "<"
+    elif hdr[:2] == b"MM": e = ">"
+    else: return None
+    magic, ifd0 = struct.unpack(e + "HI", hdr[2:8])
+    if magic not in TIFF_MAGICS: return None
+    tags = _read_ifd(r, e, ifd0, {TAG_DATETIME, TAG_EXIF_IFD})
+    if tags.get(TAG_EXIF_IFD):
+        tags.update(_read_ifd(r, e, tags[TAG_EXIF_IFD], {TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED}))
+    for tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME, TAG_DATETIME_DIGITIZED):
+        if isinstance(tags.get(tag), bytes):
+            dt = parse_exif_datetime(tags[tag])
+            if dt: return dt
+    return None
+
+
+def jpeg_datetime(r):
+    """Walks JPEG markers up to the first APP1/Exif segment (never into image data)."""
+    if r.read(0, 2) != b"\xff\xd8": return None
+    pos = 2
+    for _ in range(MAX_JPEG_SEGMENTS):
+        marker = r.read(pos, 4)
+        if len(marker) < 4 or marker[0] != 0xFF: return None
+        code = marker[1]
+        if code in (0xD9, 0xDA): return None   # EOI / start of scan
+        if code == 0x01 or 0xD0 <= code <= 0xD7: pos += 2; continue
+        length = struct.unpack(">H", marker[2:4])[0]
+        if code == 0xE1 and r.read(pos + 4, 6) == b"Exif\x00\x00":
+            dt = tiff_datetime(r.sub(pos + 10))
+            if dt: return dt
+        pos += 2 + length
+    return None
+
+
+def raf_datetime(r):
+    # Fujifilm RAF: big-endian offset of the embedded JPEG (with full EXIF) at byte 84
+    raw = r.read(84, 4)
+    if len(raw) < 4: return None
+    return jpeg_datetime(r.sub(struct.unpack(">I", raw)[0]))
+
+
+def _boxes(r, start, end):
+    """Yields (type, payload_start, box_end) for the boxes in [start, end), one header read each."""
+    pos = start
+    for _ in range(MAX_BOXES):
+        if pos + 8 > end: return
+        hdr = r.read(pos, 16)
+        if len(hdr) < 8: return
+        size, typ = struct.unpack(">I4s", hdr[:8]); hlen = 8
+        if size == 1:
+            if len(hdr) < 16: return
+            size = struct.unpack(">Q", hdr[8:16])[0]; hlen = 16
+        elif size == 0:
+            size = end - pos
+        if size < hlen: return
+        yield typ, pos + hlen, min(pos + size, end)
+        pos += size
+
+
+def _utc_to_local(dt):
+    return dt.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def _mvhd_datetime(r, start):
+    raw = r.read(start, 12)
+    if len(raw) < 8: return None
+    if raw[0] == 1:
+        if len(raw) < 12: return None
+        secs = struct.unpack(">Q", raw[4:12])[0]
+    else:
+        secs = struct.unpack(">I", raw[4:8])[0]
+    if not secs: return None
+    # mvhd times are UTC by spec; the folder date should follow the local clock
+    dt = datetime.datetime(1904, 1, 1) + datetime.timedelta(seconds=secs)
+    return _utc_to_local(dt) if dt.year >= MIN_VIDEO_YEAR else None
+
+
+def parse_iso_datetime(value):
+    """QuickTime \xa9day values: '2021-05-06T07:08:09+0200', '...Z' or a bare date."""
+    s = value.decode("utf-8", "ignore").strip("\x00 ") if isinstance(value, bytes) else str(value).strip()
+    s = s.replace("Z", "+00:00")
+    if len(s) > 5 and s[-5] in "+-" and s[-4:].isdigit(): s = s[:-2] + ":" + s[-2:]
+    try: dt = datetime.datetime.fromisoformat(s[:25])
+    except ValueError:
+        try: dt = datetime.datetime.strptime(s[:10], "%Y-%m-%d")
+        except ValueError: return None
+    if dt.tzinfo is None: return dt
+    # An explicit non-zero offset already is the shooter's wall clock; UTC needs converting
+    if dt.utcoffset() == datetime.timedelta(0): return _utc_to_local(dt.replace(tzinfo=None))
+    return dt.replace(tzinfo=None)
+
+
+def _day_datetime(r, start, end):
+    payload = r.read(start, min(end - start, 128))
+    if payload[4:8] == b"data":          # iTunes-style ilst item: data box, type + locale, text
+        return parse_iso_datetime(payload[16:])
+    if len(payload) >= 4:                # QuickTime udta item: length, language, text
+        n = struct.unpack(">H", payload[:2])[0]
+        return parse_iso_datetime(payload[4:4 + n])
+    return None
+
+
+def _find_day(r, start, end, depth=0):
+    for typ, s, e in _boxes(r, start, end):
+        if typ == b"\xa9day":
+            dt = _day_datetime(r, s, e)
+            if dt: return dt
+        elif typ in (b"udta", b"meta", b"ilst") and depth < 3:
+            # meta is a full box in MP4 (version/flags first) but a plain container in QuickTime
+            if typ == b"meta" and r.read(s + 4, 4) not in (b"hdlr", b"ilst", b"keys"): s += 4
+            dt = _find_day(r, s, e, depth + 1)
+            if dt: return dt
+    return None
+
+
+def bmff_datetime(r, file_size):
+    """Capture time from an MP4/MOV/3GP: \xa9day when present, otherwise moov/mvhd."""
+    for typ, start, end in _boxes(r, 0, file_size):
+        if typ == b"ftyp" and r.read(start, 4) in BMFF_SKIP_BRANDS: return None
+        if typ != b"moov": continue
+        created = None
+        for ctyp, s, e in _boxes(r, start, end):
+            if ctyp == b"mvhd": created = _mvhd_datetime(r, s); break
+        return _find_day(r, start, end) or created
+    return None
+
+
+def _bcd(b):
+    return (b >> 4) * 10 + (b & 0x0F)
+
+
+def _find(r, marker, limit):
+    """Absolute offset of marker within the first limit bytes, reading MAX_READ at a time."""
+    tail = b""; offset = 0
+    while offset < limit:
+        chunk = r.read(offset, MAX_READ)
+        if not chunk: return -1
+        buf = tail + chunk; i = buf.find(marker)
+        if i >= 0: return offset - len(tail) + i
+        tail = buf[-(len(marker) - 1):]; offset += len(chunk)
+    return -1
+
+
+def _is_transport_stream(head):
+    """MPEG-TS (188-byte packets) or M2TS/AVCHD (192: 4-byte timestamp + packet) with 0x47 sync bytes in place.
+
+    A single leading 0x47 is not enough: every GIF ("GIF89a") starts with one.
+    """
+    for start, step in ((0, 188), (4, 192)):
+        if len(head) > start + 2 * step and all(head[start + i * step] == 0x47 for i in range(3)):
+            return True
+    return False
+
+
+def mts_datetime(r):
+    """Recording date from the AVCHD MDPM pack (local wall clock, BCD encoded)."""
+    pos = _find(r, MDPM_MARKER, MTS_SCAN_SIZE)
+    if pos < 0: return None
+    data = r.read(pos + len(MDPM_MARKER), 1 + 5 * 16)
+    fields = {}
+    for i in range(data[0] if data else 0):
+        rec = data[1 + i * 5:6 + i * 5]
+        if len(rec) < 5: break
+        fields[rec[0]] = rec[1:]
+    date, time = fields.get(0x18), fields.get(0x19)
+    if not date: return None
+    try:
+        year = _bcd(date[1]) * 100 + _bcd(date[2])
+        day, h, mi, sec = (_bcd(b) for b in time) if time else (1, 0, 0, 0)
+        return datetime.datetime(year, _bcd(date[3]), day, h, mi, sec)
+    except ValueError:
+        return None
+
+
+def read_capture_datetime(file_path):
+    """Capture datetime from the file header, or None if unknown/unsupported."""
+    try:
+        with open(file_path, "rb") as f:
+            r = _Reader(f)
+            magic = r.head[:16]
+            if magic[:2] == b"\xff\xd8": return jpeg_datetime(r)
+            if magic[:2] in (b"II", b"MM"): return tiff_datetime(r)
+            if magic.startswith(b"FUJIFILMCCD-RAW"): return raf_datetime(r)
+            if magic[4:8] in BMFF_TOP_LEVEL: return bmff_datetime(r, os.fstat(f.fileno()).st_size)
+            if _is_transport_stream(r.head): return mts_datetime(r)
+    except (OSError, struct.error, ValueError):
+        pass
+    return None
+
+
+def _pil_capture_datetime(file_path):
+    try:
+        from PIL import Image
+    except Exception:
+        return None
+    try:
+        with Image.open(file_path) as img:
+            exif = img.getexif() or {}
+            dt = exif.get(TAG_DATETIME)
+            try: dt = exif.get_ifd(TAG_EXIF_IFD).get(TAG_DATETIME_ORIGINAL) or dt
+            except Exception: pass
+            return parse_exif_datetime(dt) if dt else None
+    except Exception:
+        return None
+
+
+class MetadataCache:
+    """On-disk cache of (capture date, type) keyed by (absolute path, size, mtime_ns).
+
+    Entries whose size or mtime changed are misses. Hits only bump an in-memory
+    LRU generation; new entries and hits are written back in batches of
+    WRITE_BATCH (so memory does not grow with the source), and flush() also
+    evicts the least recently used rows once the table exceeds max_entries.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (path TEXT PRIMARY KEY, size INTEGER, "
+                         "mtime_ns INTEGER, date TEXT, kind TEXT, used INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries(used)")
+        self._generation = (self._db.execute("SELECT MAX(used) FROM entries").fetchone()[0] or 0) + 1
+        self._touched = set()
+        self._pending = {}
+        self.hits = self.misses = 0
+
+    def get(self, path, size, mtime_ns):
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._pending.get(path)
+            if row is None:
+                row = self._db.execute("SELECT size, mtime_ns, date, kind FROM entries WHERE path=?", (path,)).fetchone()
+            if row and row[0] == size and row[1] == mtime_ns:
+                self.hits += 1; self._touched.add(path); self._write_if_full()
+                return row[2], row[3]
+            self.misses += 1
+            return None
+
+    def put(self, path, size, mtime_ns, date, kind=None):
+        with self._lock:
+            self._pending[os.path.abspath(path)] = (size, mtime_ns, date, kind)
+            self._write_if_full()
+
+    def _write_if_full(self):
+        if len(self._pending) + len(self._touched) >= WRITE_BATCH:
+            with self._db: self._write_batch()
+
+    def _write_batch(self):
+        g = self._generation
+        self._db.executemany("INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?)",
+                             [(p, *row, g) for p, row in self._pending.items()])
+        self._db.executemany("UPDATE entries SET used=? WHERE path=?", [(g, p) for p in self._touched])
+        self._pending.clear(); self._touched.clear()
+
+    def flush(self):
+        with self._lock:
+            with self._db:
+                self._write_batch()
+                count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                if count > self.max_entries:
+                    # Evict down to 90% so steady-state imports don't trim on every flush
+                    excess = count - int(self.max_entries * 0.9)
+                    self._db.execute("DELETE FROM entries WHERE path IN "
+                                     "(SELECT path FROM entries ORDER BY used LIMIT ?)", (excess,))
+
+    def close(self):
+        self.flush()
+        with self._lock: self._db.close()
+
+
+def _capture_date(file_path, st=None):
+    dt = read_capture_datetime(file_path)
+    if dt is None and os.path.splitext(file_path)[1].lower() in PIL_FALLBACK_EXTS:
+        dt = _pil_capture_datetime(file_path)
+    if dt is None:
+        dt = datetime.datetime.fromtimestamp(st.st_mtime if st else os.path.getmtime(file_path))
+    return dt.strftime("%d-%m-%Y")
+
+
+# Obtiene la fecha de captura (cabecera EXIF o contenedor de vídeo; PIL como último recurso; si no, fecha de modificación)
+def get_capture_date(file_path, cache=None, kind=None, st=None):
+    # Devuelve formato DD-MM-YYYY; con caché, un acierto no abre el archivo.
+    # st: el stat que ya trae el escaneo (scandir), para no repetirlo
+    try:
+        if cache is None: return _capture_date(file_path, st)
+        if st is None: st = os.stat(file_path)
+        hit = cache.get(file_path, st.st_size, st.st_mtime_ns)
+        if hit: return hit[0]
+        date = _capture_date(file_path, st)
+        cache.put(file_path, st.st_size, st.st_mtime_ns, date, kind)
+        return date
+    except Exception:
+        return datetime.date.today().strftime("%d-%m-%Y")
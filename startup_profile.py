@@ -0,0 +1,66 @@
+"""Startup timing for `python main.py --profile-startup`.
+
+Phases are marked with a monotonic clock from the first line of main.py up to
+the first Expose event of the main window (time-to-first-paint). On Linux the
+interpreter's own startup, before main.py runs, is reported as well.
+"""
+import json, os, sys, time
+
+
+def process_age():
+    """Seconds since this process started, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat", "r") as f: fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as f: uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except Exception:
+        return None
+
+
+class StartupProfile:
+    def __init__(self, t0=None, enabled=True):
+        self.enabled = enabled
+        self.t0 = self._last = t0 if t0 is not None else time.perf_counter()
+        # /proc reports in clock ticks (usually 10 ms): good enough for the interpreter share
+        age = process_age() if enabled else None
+        self.interpreter = None if age is None else max(0.0, age - (time.perf_counter() - self.t0))
+        self.phases = []
+        self.done = False
+
+    def mark(self, name):
+        """Closes the phase that started at the previous mark (or at t0)."""
+        if not self.enabled or self.done: return
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return (self._last - self.t0) + (self.interpreter or 0.0)
+
+    def as_dict(self):
+        phases = ([("interpreter", self.interpreter)] if self.interpreter is not None else []) + self.phases
+        return {"time_to_first_paint_ms": round(self.total() * 1000, 1),
+                "phases_ms": {name: round(sec * 1000, 1) for name, sec in phases}}
+
+    def report(self, stream=None, json_path=None):
+        """Writes the breakdown as JSON (optionally), prints it and returns its lines; call once after first paint.
+
+        sys.stderr is None in a windowed (--windowed PyInstaller) build: then nothing is printed.
+        """
+        if not self.enabled or self.done: return []
+        self.done = True
+        data = self.as_dict(); total = data["time_to_first_paint_ms"]
+        if json_path:
+            try:
+                with open(json_path, "w", encoding="utf-8") as f: json.dump(data, f, indent=2)
+            except OSError:
+                pass
+        lines = [f"Startup profile: first paint after {total:.1f} ms"]
+        for name, ms in data["phases_ms"].items():
+            share = 100 * ms / total if total else 0.0
+            lines.append(f"  {name:<22} {ms:>8.1f} ms  {share:>5.1f}%")
+        stream = stream or sys.stderr
+        if stream is not None:
+            try: stream.write("\n".join(lines) + "\n"); stream.flush()
+            except (OSError, ValueError): pass
+        return lines
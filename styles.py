@@ -1,95 +1,120 @@
+import json, os
 import tkinter as tk
 from tkinter import ttk
 import tkinter.font as tkfont
-from dataclasses import dataclass
 
-try:
-    import customtkinter as ctk
-except Exception:
-    ctk = None
+FONT_CANDIDATES = ['Roboto', 'Poppins', 'Segoe UI', 'Arial']
+FALLBACK_FAMILY = 'Arial'
 
-@dataclass
-class Styles:
-    UI_FONT_FAMILY: str = "Arial"
+# nombre -> (familia, tamaño, peso); familia None = UI_FONT_FAMILY
+CTK_FONT_SPECS = {
     # Jerarquía tipográfica al estilo Apple
-    LARGE_TITLE_FONT: object | None = None      # 28pt, Bold - Para títulos principales
-    TITLE_1_FONT: object | None = None          # 22pt, Bold - Títulos de sección
-    TITLE_2_FONT: object | None = None          # 17pt, Bold - Subtítulos importantes
-    TITLE_3_FONT: object | None = None          # 15pt, Semibold - Subtítulos menores
-    HEADLINE_FONT: object | None = None         # 14pt, Semibold - Headlines
-    BODY_FONT: object | None = None             # 13pt, Regular - Texto principal
-    CALLOUT_FONT: object | None = None          # 12pt, Regular - Texto destacado
-    SUBHEADLINE_FONT: object | None = None      # 11pt, Regular - Subtextos
-    FOOTNOTE_FONT: object | None = None         # 10pt, Regular - Notas al pie
-    CAPTION_1_FONT: object | None = None        # 9pt, Regular - Captions principales
-    CAPTION_2_FONT: object | None = None        # 8pt, Regular - Captions secundarios
-    
+    "LARGE_TITLE_FONT": (None, 28, "bold"),     # Para títulos principales
+    "TITLE_1_FONT": (None, 22, "bold"),         # Títulos de sección
+    "TITLE_2_FONT": (None, 17, "bold"),         # Subtítulos importantes
+    "TITLE_3_FONT": (None, 15, "bold"),         # Subtítulos menores
+    "HEADLINE_FONT": (None, 14, "bold"),        # Headlines
+    "BODY_FONT": (None, 13, "normal"),          # Texto principal
+    "CALLOUT_FONT": (None, 12, "normal"),       # Texto destacado
+    "SUBHEADLINE_FONT": (None, 11, "normal"),   # Subtextos
+    "FOOTNOTE_FONT": (None, 10, "normal"),      # Notas al pie
+    "CAPTION_1_FONT": (None, 9, "normal"),      # Captions principales
+    "CAPTION_2_FONT": (None, 8, "normal"),      # Captions secundarios
     # Fuentes especiales
-    EMOJI_FONT: object | None = None
-    MONOSPACE_FONT: object | None = None        # Para logs y código
-    
-    # Compatibilidad con código existente
-    BASE_FONT: object | None = None
-    TITLE_FONT: object | None = None
-    SMALL_FONT: object | None = None
-    LABEL_FONT_BOLD: object | None = None
-    ENTRY_FONT: object | None = None
+    "EMOJI_FONT": ("Segoe UI Emoji", 16, "normal"),
+    "MONOSPACE_FONT": ("Consolas", 11, "normal"),   # Para logs y código
+    "LABEL_FONT_BOLD": (None, 12, "bold"),
+}
+# Compatibilidad con código existente
+FONT_ALIASES = {"BASE_FONT": "CALLOUT_FONT", "TITLE_FONT": "TITLE_2_FONT",
+                "SMALL_FONT": "SUBHEADLINE_FONT", "ENTRY_FONT": "BODY_FONT"}
+
+
+class Styles:
+    """Fuentes de la UI. En CTk cada fuente se crea la primera vez que se usa,
+    así que la ventana no paga por fuentes que solo necesita Settings; en ttk
+    las fuentes se configuran en los estilos y los atributos valen None."""
+
+    def __init__(self, family=FALLBACK_FAMILY, ctk_module=None):
+        self.UI_FONT_FAMILY = family
+        self._ctk = ctk_module
+
+    def __getattr__(self, name):
+        if name.startswith("_"): raise AttributeError(name)
+        key = FONT_ALIASES.get(name, name)
+        spec = CTK_FONT_SPECS.get(key)
+        if spec is None: raise AttributeError(name)
+        font = None
+        if self._ctk is not None:
+            family, size, weight = spec
+            try: font = self._ctk.CTkFont(family=family or self.UI_FONT_FAMILY, size=size, weight=weight)
+            except Exception: font = None   # en CTk cualquier fallo no debe romper la app
+        setattr(self, key, font)
+        if key != name: setattr(self, name, font)
+        return font
+
+
+def _family_available(root, name):
+    try: return tkfont.Font(root=root, family=name, size=10).actual("family") == name
+    except Exception: return False
 
 
-def pick_font_family(root: tk.Misc) -> str:
+def pick_font_family(root: tk.Misc, cache_path: str | None = None) -> str:
+    """Primera familia de FONT_CANDIDATES instalada.
+
+    Listar todas las familias (tkfont.families) es lento con muchas fuentes
+    instaladas; con cache_path la elección se guarda en disco y en los
+    siguientes arranques solo se comprueba con una única consulta de fuente.
+    """
+    if cache_path:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f: cached = json.load(f)
+            family = cached.get("family")
+            if cached.get("candidates") == FONT_CANDIDATES and family and \
+                    (family == FALLBACK_FAMILY or _family_available(root, family)):
+                return family
+        except Exception:
+            pass
     try:
         fams = set(tkfont.families(root))
     except Exception:
         fams = set()
-    for name in ['Roboto', 'Poppins', 'Segoe UI', 'Arial']:
-        if name in fams:
-            return name
-    return 'Arial'
+    family = next((name for name in FONT_CANDIDATES if name in fams), FALLBACK_FAMILY)
+    if cache_path:
+        try:
+            tmp = cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f: json.dump({"candidates": FONT_CANDIDATES, "family": family}, f)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return family
 
 
-def apply_styles(root: tk.Misc, use_ctk: bool = True) -> Styles:
+def apply_styles(root: tk.Misc, use_ctk: bool = True, font_cache: str | None = None) -> Styles:
     """Configura estilos (CTk o ttk) y devuelve fuentes y tema.
-    - CTk: establece modo y tema por defecto y crea fuentes de UI.
+    - CTk: establece el tema por defecto; las fuentes se crean al primer uso.
     - ttk: aplica una paleta compacta y moderna con estilos nombrados.
     """
-    s = Styles()
-    s.UI_FONT_FAMILY = pick_font_family(root)
+    family = pick_font_family(root, font_cache)
 
-    if use_ctk and ctk is not None:
+    ctk = None
+    if use_ctk:
+        try:
+            import customtkinter as ctk
+        except Exception:
+            ctk = None
+    if ctk is not None:
+        s = Styles(family, ctk)
         try:
             # No forzar modo (light/dark); respetar el tema guardado y el actual.
             # Mantener solo el tema de colores por defecto.
             ctk.set_default_color_theme("blue")
-            
-            # Jerarquía tipográfica al estilo Apple
-            s.LARGE_TITLE_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=28, weight="bold")
-            s.TITLE_1_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=22, weight="bold")
-            s.TITLE_2_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=17, weight="bold")
-            s.TITLE_3_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=15, weight="bold")
-            s.HEADLINE_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=14, weight="bold")
-            s.BODY_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=13)
-            s.CALLOUT_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=12)
-            s.SUBHEADLINE_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=11)
-            s.FOOTNOTE_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=10)
-            s.CAPTION_1_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=9)
-            s.CAPTION_2_FONT = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=8)
-            
-            # Fuentes especiales
-            s.EMOJI_FONT = ctk.CTkFont(family="Segoe UI Emoji", size=16)
-            s.MONOSPACE_FONT = ctk.CTkFont(family="Consolas", size=11)
-            
-            # Compatibilidad con código existente
-            s.BASE_FONT = s.CALLOUT_FONT
-            s.TITLE_FONT = s.TITLE_2_FONT
-            s.SMALL_FONT = s.SUBHEADLINE_FONT
-            s.LABEL_FONT_BOLD = ctk.CTkFont(family=s.UI_FONT_FAMILY, size=12, weight="bold")
-            s.ENTRY_FONT = s.BODY_FONT
         except Exception:
-            # en CTk cualquier fallo no debe romper la app; devolvemos estilos básicos
             pass
         return s
 
     # Fallback ttk (sobrio y compacto) con jerarquía tipográfica mejorada
+    s = Styles(family)
     style = ttk.Style(root)
     try:
         style.theme_use('clam')
@@ -0,0 +1,133 @@
+"""Per-stage timings and per-file outcomes of one transfer run.
+
+Hot paths only add a perf_counter delta to a fixed-size histogram per stage
+(nothing is logged per file), so memory stays flat however many files the
+source holds. Stages:
+
+    scan          listing one source directory (scandir plus its entries' stat)
+    capture_date  get_capture_date for one file (grouped modes)
+    dedup         duplicate check for one file
+    makedirs      creating one destination directory
+    dest_name     resolving and claiming a free destination name
+    copy          copying one file (verification included)
+    rename        one same-device move
+    journal       one journal write
+    callbacks     progress/log/on_file_done callbacks (UI hand-off)
+
+Per-file outcomes are streamed to transfer-<timestamp>.csv as they happen;
+transfer-<timestamp>.json, written at the end, holds totals, outcome counts
+and per-stage statistics. Percentiles come from logarithmic buckets, 20 per
+decade, so they are exact to within about 12%.
+"""
+import datetime, json, math, os, threading, time
+
+STAGES = ("scan", "capture_date", "dedup", "makedirs", "dest_name", "copy", "rename", "journal", "callbacks")
+PERCENTILES = (50, 90, 99)
+CSV_FIELDS = ("src", "dest", "kind", "size", "outcome", "seconds", "error")
+# Histogram: 1 µs ... ~3 h in buckets of 10^(1/20)
+BUCKET_MIN = 1e-6
+BUCKETS_PER_DECADE = 20
+BUCKET_COUNT = 200
+
+now = time.perf_counter
+
+
+class StageStats:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0; self.total = 0.0; self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def add(self, seconds):
+        self.count += 1; self.total += seconds
+        if seconds > self.max: self.max = seconds
+        i = int(math.log10(seconds / BUCKET_MIN) * BUCKETS_PER_DECADE) if seconds > BUCKET_MIN else 0
+        self.buckets[min(i, BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, p):
+        """Upper edge of the bucket holding the p-th percentile (nearest rank), capped at max."""
+        rank = max(1, -(-self.count * p // 100)); seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank: return min(self.max, BUCKET_MIN * 10 ** ((i + 1) / BUCKETS_PER_DECADE))
+        return self.max
+
+    def as_dict(self):
+        return {"count": self.count, "total_s": round(self.total, 6), "mean_ms": round(1000 * self.total / self.count, 4),
+                **{f"p{p}_ms": round(1000 * self.percentile(p), 4) for p in PERCENTILES},
+                "max_ms": round(1000 * self.max, 4)}
+
+
+class TransferReport:
+    """Collects one run's timings; with a directory, per-file rows go to a CSV there as they happen."""
+
+    def __init__(self, directory=None):
+        self._lock = threading.Lock()
+        self.started = datetime.datetime.now()
+        self._t0 = now()
+        self.stages = {stage: StageStats() for stage in STAGES}
+        self.counts = {}        # outcome -> files
+        self.directory = directory
+        self.stem = None
+        self._csv = self._f = None
+
+    def add(self, stage, seconds):
+        with self._lock: self.stages[stage].add(seconds)
+
+    def since(self, stage, t0):
+        """Records the time elapsed since t0 (a now() value) under stage."""
+        self.add(stage, now() - t0)
+
+    def _open(self):
+        import csv
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, "transfer-" + self.started.strftime("%Y%m%d-%H%M%S"))
+        n = 1; stem = base
+        while os.path.exists(stem + ".json") or os.path.exists(stem + ".csv"):
+            n += 1; stem = f"{base}_{n}"      # "_" ordena tras "."
+        self.stem = stem
+        self._f = open(stem + ".csv", "w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._f); self._csv.writerow(CSV_FIELDS)
+
+    def file(self, job, outcome, seconds=0.0, error=None):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            if self.directory is None: return
+            if self._f is None:
+                try: self._open()
+                except OSError: self.directory = None; return
+            self._csv.writerow((job.src, job.dest_path, job.kind, job.size, outcome, round(seconds, 6), error))
+
+    def stage_summary(self):
+        return {stage: s.as_dict() for stage, s in self.stages.items() if s.count}
+
+    def as_dict(self, **run):
+        return {"started": self.started.isoformat(timespec="seconds"), "wall_s": round(now() - self._t0, 6),
+                **run, "outcomes": dict(self.counts), "stages": self.stage_summary(),
+                "files_csv": os.path.basename(self.stem + ".csv") if self._f else None}
+
+    def write(self, keep=20, **run):
+        """Closes the per-file CSV and writes the JSON summary next to it; returns the JSON path.
+
+        Only the newest `keep` reports are kept in the directory.
+        """
+        if self.directory is None: return None
+        with self._lock:
+            if self._f is None: self._open()
+            self._f.close()
+        with open(self.stem + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(**run), f, indent=1, ensure_ascii=False)
+        prune_reports(self.directory, keep)
+        return self.stem + ".json"
+
+
+def prune_reports(directory, keep):
+    try:
+        reports = sorted(n for n in os.listdir(directory) if n.startswith("transfer-") and n.endswith(".json"))
+    except OSError:
+        return
+    for name in reports[:max(0, len(reports) - keep)]:
+        for ext in (".json", ".csv"):
+            try: os.remove(os.path.join(directory, name[:-5] + ext))
+            except OSError: pass
@@ -0,0 +1,59 @@
+"""Thread-safe update channel from transfer threads to the Tk main loop.
+
+Worker threads never touch widgets: they post updates here and the Tk thread
+drains them at a fixed frame rate. Updates posted with a key are coalesced
+(only the latest one per key survives a frame, e.g. progress and status),
+and log lines are batched into a single sink call per frame, so UI cost per
+frame stays constant no matter how many files are transferred.
+"""
+import itertools, threading
+
+DEFAULT_HZ = 20
+
+
+class UIChannel:
+    def __init__(self, root, log_sink, hz=DEFAULT_HZ):
+        self.root = root
+        self.log_sink = log_sink
+        self.interval_ms = max(1, int(1000 / hz))
+        self._lock = threading.Lock()
+        self._pending = {}            # key -> (fn, args), ordered by latest post
+        self._lines = []
+        self._seq = itertools.count()
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+
+    def post(self, fn, *args, key=None):
+        """Runs fn(*args) on the Tk thread at the next frame; a keyed post replaces older ones."""
+        with self._lock:
+            if key is None: key = ("call", next(self._seq))
+            self._pending.pop(key, None)
+            self._pending[key] = (fn, args)
+
+    def log(self, text):
+        with self._lock: self._lines.append(text)
+
+    def flush(self):
+        """Applies everything pending now; must be called on the Tk thread."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            lines, self._lines = self._lines, []
+        if lines:
+            try: self.log_sink(lines)
+            except Exception: pass
+        for fn, args in pending.values():
+            try: fn(*args)
+            except Exception: pass
+
+    def _drain(self):
+        self.flush()
+        if self._running:
+            try: self.root.after(self.interval_ms, self._drain)
+            except Exception: self._running = False
@@ -0,0 +1,106 @@
+"""Copy with streaming checksum verification.
+
+The source is hashed while it is copied, so it is read exactly once. The
+destination is then flushed to disk and read back for a second hash; on
+Linux its pages are dropped from the page cache first (posix_fadvise
+DONTNEED), so the read-back comes from the device instead of the copy we
+just wrote. Elsewhere the post-read is a plain buffered read.
+
+Algorithms: "xxhash" (XXH3-128, needs the optional xxhash package; falls back
+to BLAKE2b when it is missing) and "blake2b" (hashlib, always available).
+"""
+import hashlib, os, shutil
+
+from copy_backends import USERSPACE_CHUNK_SIZE
+
+HASH_ALGORITHMS = ("xxhash", "blake2b")
+DEFAULT_ALGORITHM = "xxhash"
+DEFAULT_RETRIES = 2
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+class VerificationError(OSError):
+    """Destination content did not match the source after every retry."""
+
+
+def resolve_algorithm(name):
+    """Algorithm actually used for name ("xxhash" degrades to "blake2b" without the package)."""
+    if name == "xxhash" and xxhash is not None: return "xxhash"
+    return "blake2b"
+
+
+def new_hasher(name):
+    if resolve_algorithm(name) == "xxhash": return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _drop_cache(fd):
+    if hasattr(os, "posix_fadvise"):
+        try: os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError: pass
+
+
+def hash_file(path, algorithm=DEFAULT_ALGORITHM, chunk_size=USERSPACE_CHUNK_SIZE, uncached=False, on_chunk=None):
+    """Digest of path; uncached=True asks the OS to drop cached pages before reading.
+
+    on_chunk() is called after every chunk and may raise to abort the read.
+    """
+    h = new_hasher(algorithm)
+    buf = bytearray(chunk_size); view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        if uncached: _drop_cache(f.fileno())
+        while True:
+            n = f.readinto(buf)
+            if not n: break
+            h.update(view[:n])
+            if on_chunk: on_chunk()
+    return h.digest()
+
+
+def copy_hashed(src, dst, algorithm=DEFAULT_ALGORITHM, chunk_size=USERSPACE_CHUNK_SIZE, on_bytes=None):
+    """Copies src to dst (copy2 semantics) hashing the bytes as they pass; returns the digest.
+
+    dst is fsynced before returning so the read-back in verified_copy checks
+    what actually reached the device.
+    """
+    h = new_hasher(algorithm)
+    buf = bytearray(chunk_size); view = memoryview(buf)
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        while True:
+            n = fsrc.readinto(buf)
+            if not n: break
+            chunk = view[:n]
+            h.update(chunk)
+            written = 0
+            while written < n: written += fdst.write(chunk[written:])
+            if on_bytes: on_bytes(n)
+        os.fsync(fdst.fileno())
+    shutil.copystat(src, dst)
+    return h.digest()
+
+
+def verified_copy(src, dst, algorithm=DEFAULT_ALGORITHM, retries=DEFAULT_RETRIES,
+                  chunk_size=USERSPACE_CHUNK_SIZE, on_bytes=None, log=None, size=None):
+    """Copy backend (copy(src, dst, on_bytes=None, size=None)) that only returns once dst hashes like src.
+
+    A mismatch recopies the file up to `retries` more times, then raises
+    VerificationError. Used as the move copy step, the source is therefore
+    never deleted before its copy has been verified.
+
+    The read-back calls on_bytes(0) per chunk, so a callback that aborts the
+    copy (cancellation) also interrupts a long verification. size is
+    accepted like any backend's but unused: the hashed copy streams to EOF.
+    """
+    # Los reintentos y la relectura no suman bytes al progreso, pero siguen avisando a on_bytes
+    silent = (lambda n=0: on_bytes(0)) if on_bytes else None
+    for attempt in range(retries + 1):
+        expected = copy_hashed(src, dst, algorithm, chunk_size, on_bytes if attempt == 0 else silent)
+        if hash_file(dst, algorithm, chunk_size, uncached=True, on_chunk=silent) == expected:
+            return dst
+        if log and attempt < retries:
+            log(f"Checksum mismatch for {os.path.basename(src)}, retrying ({attempt + 1}/{retries})")
+    raise VerificationError(f"Checksum mismatch after {retries + 1} attempts: {src}")